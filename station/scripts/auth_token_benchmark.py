@@ -0,0 +1,194 @@
+# auth_token_benchmark.py
+"""
+AuthServer token endpoint load benchmark.
+
+Every Station client starts at AUTH_HOST/connect/token, and issuance spikes
+when all services restart during a deploy. This benchmark drives the
+client_credentials grant (as the access_token fixture does) and the password
+grant (as admin_access_token does) concurrently from the same threads, mixed
+by --password-share, at each concurrency level. It reports issuance latency
+percentiles and throughput per grant, and validates every issued token:
+
+    token_type is Bearer and expires_in is positive
+    expires_in matches --expected-lifetime-hours (the AuthServer ExpirationHour setting), if given
+    the JWT exp - iat matches expires_in, exp is in the future and aud contains --audience
+
+Tokens that fail validation count as errors and are tallied by reason.
+
+Example:
+    python station/scripts/auth_token_benchmark.py --levels 1,8,32,64 --password-share 0.5 --duration 30
+"""
+import argparse
+import base64
+import itertools
+import json
+import logging
+import threading
+import time
+
+import benchmark_common
+from benchmark_common import ADMIN_PASSWORD, ADMIN_USERNAME
+
+logger = logging.getLogger(__name__)
+
+
+def decode_jwt_claims(token):
+    """claims of a JWT access token (without verifying the signature), or None for opaque tokens"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4))
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class TokenValidator:
+    """Validates issued tokens and tallies the problems per grant across request threads."""
+
+    def __init__(self, expected_lifetime=None, tolerance=5, audience=None):
+        self.expected_lifetime = expected_lifetime
+        self.tolerance = tolerance
+        self.audience = audience
+        self.measure_from = 0.0  # tokens issued before this perf_counter time (warmup) are not tallied
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def problems(self, body):
+        """list of validation problems for one token response (empty when valid)"""
+        problems = []
+        token, expires_in = body.get("access_token"), body.get("expires_in")
+        if not token:
+            return ["missing access_token"]
+        if str(body.get("token_type", "")).lower() != "bearer":
+            problems.append("token_type is not Bearer")
+        if not isinstance(expires_in, (int, float)) or expires_in <= 0:
+            return problems + ["missing expires_in"]
+        if self.expected_lifetime is not None and abs(expires_in - self.expected_lifetime) > self.tolerance:
+            problems.append("expires_in differs from expected lifetime")
+
+        claims = decode_jwt_claims(token)
+        if claims is None:
+            return problems
+        if "exp" in claims and "iat" in claims and abs(claims["exp"] - claims["iat"] - expires_in) > self.tolerance:
+            problems.append("exp - iat differs from expires_in")
+        if claims.get("exp", float("inf")) <= time.time() - self.tolerance:
+            problems.append("token already expired")
+        if self.audience:
+            audience = claims.get("aud", [])
+            if self.audience not in (audience if isinstance(audience, list) else [audience]):
+                problems.append(f"aud does not contain {self.audience}")
+        return problems
+
+    def check(self, grant, body):
+        problems = self.problems(body)
+        if time.perf_counter() < self.measure_from:
+            return not problems
+        claims = decode_jwt_claims(body.get("access_token") or "")
+        expires_in = body.get("expires_in")
+        with self.lock:
+            stats = self._stats(grant)
+            stats["Issued"] += 1
+            if claims is None:
+                stats["OpaqueTokens"] += 1
+            if isinstance(expires_in, (int, float)):
+                stats["MinExpiresIn"] = min(expires_in, stats["MinExpiresIn"] or expires_in)
+                stats["MaxExpiresIn"] = max(expires_in, stats["MaxExpiresIn"] or expires_in)
+            if problems:
+                stats["Invalid"] += 1
+                for problem in problems:
+                    stats["Problems"][problem] = stats["Problems"].get(problem, 0) + 1
+        return not problems
+
+    def http_error(self, grant, status_code):
+        if time.perf_counter() < self.measure_from:
+            return
+        with self.lock:
+            errors = self._stats(grant)["HttpErrors"]
+            errors[str(status_code)] = errors.get(str(status_code), 0) + 1
+
+    def _stats(self, grant):
+        return self.stats.setdefault(grant, {
+            "Issued": 0, "Invalid": 0, "OpaqueTokens": 0, "MinExpiresIn": None, "MaxExpiresIn": None,
+            "Problems": {}, "HttpErrors": {},
+        })
+
+
+def token_request(password_share, username, password, validator):
+    """build a run_closed_loop request callable interleaving both grants by `password_share`"""
+    grants = {
+        "client_credentials": benchmark_common.client_credentials_grant(),
+        "password": benchmark_common.password_grant(username, password),
+    }
+    counter = itertools.count()
+
+    def request(session):
+        n = next(counter)
+        # Bresenham-style interleave: exactly `password_share` of the calls use the password grant
+        grant = "password" if int((n + 1) * password_share) > int(n * password_share) else "client_credentials"
+        response = benchmark_common.request_token(session, grants[grant])
+        if response.status_code != 200:
+            validator.http_error(grant, response.status_code)
+            return False, grant
+        return validator.check(grant, response.json()), grant
+
+    return request
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AuthServer token endpoint load benchmark")
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32, 64],
+                        help="concurrency levels (threads issuing tokens)")
+    parser.add_argument("--password-share", type=float, default=0.5,
+                        help="share of requests using the password grant (rest use client_credentials)")
+    parser.add_argument("--username", default=ADMIN_USERNAME, help="password grant user")
+    parser.add_argument("--password", default=ADMIN_PASSWORD)
+    parser.add_argument("--expected-lifetime-hours", type=float,
+                        help="expected access token lifetime (AuthServer ExpirationHour); default only checks consistency")
+    parser.add_argument("--lifetime-tolerance", type=float, default=5, help="seconds of slack in lifetime checks")
+    parser.add_argument("--audience", default="Aevatar", help="audience every token must carry (empty to skip)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--output-file", default="auth-token-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    if not 0 <= args.password_share <= 1:
+        parser.error("--password-share must be between 0 and 1")
+    expected_lifetime = args.expected_lifetime_hours * 3600 if args.expected_lifetime_hours else None
+
+    results = []
+    for level in args.levels:
+        validator = TokenValidator(expected_lifetime, args.lifetime_tolerance, args.audience)
+        request = token_request(args.password_share, args.username, args.password, validator)
+        logger.info(f"🔑 Issuing tokens from {level} threads for {args.duration}s")
+        validator.measure_from = time.perf_counter() + args.warmup
+        result = benchmark_common.run_closed_loop(request, level, args.duration, args.warmup)
+        result["Validation"] = validator.stats
+        results.append(result)
+
+        logger.info(f"⚡ {level:4d} threads | {result['ActualThroughput']:8.1f} tokens/s | "
+                    f"p50 {result['MedianLatencyMs']:.1f}ms p95 {result['P95LatencyMs']:.1f}ms "
+                    f"p99 {result['P99LatencyMs']:.1f}ms | errors {result['ErrorCount']}")
+        for grant, stats in result.get("ByKey", {}).items():
+            validation = validator.stats.get(grant, {})
+            logger.info(f"   {grant:18s} | {stats['Throughput']:8.1f}/s | p50 {stats['MedianLatencyMs']:.1f}ms "
+                        f"p95 {stats['P95LatencyMs']:.1f}ms p99 {stats['P99LatencyMs']:.1f}ms | "
+                        f"expires_in {validation.get('MinExpiresIn')}-{validation.get('MaxExpiresIn')}s "
+                        f"invalid {validation.get('Invalid', 0)}")
+        for grant, stats in validator.stats.items():
+            for problem, count in stats["Problems"].items():
+                logger.warning(f"⚠️  {grant}: {count} tokens with {problem}")
+            for status, count in stats["HttpErrors"].items():
+                logger.warning(f"⚠️  {grant}: {count} requests failed with HTTP {status}")
+
+    configuration = {k: v for k, v in vars(args).items() if k not in ("verbose", "password")}
+    benchmark_common.write_report(args.output_file, configuration, results)
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if all(r["Success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+# benchmark_common.py
+"""
+Shared helpers for the Python benchmark scripts in station/scripts.
+
+Environment variables match regression_test.py (AUTH_HOST, API_HOST,
+API_SERVER_HOST, CLIENT_ID, CLIENT_SECRET) so the same ephemeral environment
+settings drive both the regression suite and the benchmarks.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+import urllib3
+
+from latency_histogram import LatencyHistogram
+
+# Disable SSL warnings for testing with self-signed certificates
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+AUTH_HOST = os.getenv("AUTH_HOST")
+API_SERVER_HOST = os.getenv("API_SERVER_HOST")  # Only for CopyDeploymentWithPattern
+API_HOST = os.getenv("API_HOST")  # For most API endpoints
+CLIENT_ID = os.getenv("CLIENT_ID")
+CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "1q2W3e*")
+
+
+def configure_logging(verbose=False):
+    """configure console logging for benchmark entry points"""
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+def client_credentials_grant():
+    """form data for the client_credentials grant"""
+    return {
+        "grant_type": "client_credentials",
+        "client_id": CLIENT_ID,
+        "client_secret": CLIENT_SECRET,
+        "scope": "Aevatar"
+    }
+
+
+def password_grant(username, password):
+    """form data for the password grant, as used by admin_access_token in regression_test.py"""
+    return {
+        "grant_type": "password",
+        "username": username,
+        "password": password,
+        "scope": "Aevatar",
+        "client_id": "AevatarAuthServer"
+    }
+
+
+def fetch_client_token(session=None):
+    """get access token with the client_credentials grant"""
+    return _fetch_token(session, client_credentials_grant())
+
+
+def fetch_admin_token(session=None):
+    """get access token with the password grant for the admin user"""
+    return fetch_password_token(ADMIN_USERNAME, ADMIN_PASSWORD, session)
+
+
+def fetch_password_token(username, password, session=None):
+    """get access token with the password grant"""
+    return _fetch_token(session, password_grant(username, password))
+
+
+def request_token(session, auth_data):
+    """POST `auth_data` to the token endpoint and return the raw response"""
+    return (session or requests).post(
+        f"{AUTH_HOST}/connect/token",
+        data=auth_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        verify=False
+    )
+
+
+def _fetch_token(session, auth_data):
+    response = request_token(session, auth_data)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def bearer_headers(token):
+    """generate request header with access token"""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+
+
+def run_closed_loop(request, concurrency, duration, warmup=0):
+    """
+    Call `request(session)` back-to-back from `concurrency` threads for `duration`
+    seconds (after `warmup` seconds whose samples are discarded), each thread with
+    its own requests.Session and LatencyHistogram.
+
+    `request` returns True on success, or `(ok, key)` to additionally group
+    latencies by `key` (reported under "ByKey"). Returns a result dict shaped
+    like the C# BenchmarkResult.
+    """
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    histograms, keyed, errors = [], [], []
+
+    def loop():
+        session = requests.Session()
+        histogram, by_key, failed = LatencyHistogram(), {}, 0
+        histograms.append(histogram)
+        keyed.append(by_key)
+        while True:
+            sent_at = time.perf_counter()
+            if sent_at >= deadline:
+                break
+            try:
+                outcome = request(session)
+            except requests.RequestException:
+                outcome = False
+            ok, key = outcome if isinstance(outcome, tuple) else (outcome, None)
+            if sent_at < measure_from:
+                continue
+            if not ok:
+                failed += 1
+                continue
+            latency_us = (time.perf_counter() - sent_at) * 1_000_000
+            histogram.record_value(latency_us)
+            if key is not None:
+                by_key.setdefault(key, LatencyHistogram()).record_value(latency_us)
+        errors.append(failed)
+        session.close()
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # requests sent before the deadline are recorded even when they complete after it,
+    # so the measured window runs until the last thread has finished
+    elapsed = max(time.perf_counter() - measure_from, 0.0)
+
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.add(histogram)
+    by_key = {}
+    for per_thread in keyed:
+        for key, histogram in per_thread.items():
+            by_key.setdefault(key, LatencyHistogram()).add(histogram)
+
+    processed, failed = merged.total_count, sum(errors)
+    result = {
+        "ConcurrencyLevel": concurrency,
+        "DurationSeconds": duration,
+        "ActualDurationSeconds": elapsed,
+        "Success": processed > 0,
+        "TotalEventsSent": processed + failed,
+        "TotalEventsProcessed": processed,
+        "ErrorCount": failed,
+        "ActualThroughput": processed / elapsed if elapsed > 0 else 0.0,
+        **merged.summary(),
+    }
+    if by_key:
+        result["ByKey"] = {
+            str(key): dict(histogram.summary(), Count=histogram.total_count,
+                           Throughput=histogram.total_count / elapsed if elapsed > 0 else 0.0)
+            for key, histogram in sorted(by_key.items())
+        }
+    return result
+
+
+def write_report(path, configuration, results, summary=None):
+    """
+    Write a benchmark report in the same shape as the C# benchmarks
+    (Configuration / Results / Summary / GeneratedAt), so the jq checks in
+    unified-benchmark-runner.sh can read Python results unchanged.
+    `summary` adds tool-specific fields to the Summary section.
+    """
+    successful = [r for r in results if r.get("Success")]
+    report = {
+        "Configuration": configuration,
+        "Results": results,
+        "Summary": {
+            "TotalResults": len(results),
+            "SuccessfulResults": len(successful),
+            "FailedResults": len(results) - len(successful),
+            "MaxThroughput": max((r.get("ActualThroughput", 0) for r in results), default=0),
+            "BestP95Latency": min((r.get("P95LatencyMs", 0) for r in successful), default=0),
+            "BestP99Latency": min((r.get("P99LatencyMs", 0) for r in successful), default=0),
+            **(summary or {}),
+        },
+        "GeneratedAt": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,166 @@
+# capacity_search.py
+"""
+Capacity search against latency SLOs.
+
+unified-benchmark-runner.sh checks pass/fail at one fixed configuration. This
+tool answers the question behind it: what is the highest request rate the
+deployment sustains while p95 and p99 stay under the SLO thresholds
+(LAT_P95_MS / LAT_P99_MS, 120ms / 1000ms by default)?
+
+It runs short open-loop trials of the load generator scenario. The rate is
+doubled from --start-rate until a trial breaks the SLOs, then the interval
+between the last passing and the first failing rate is bisected until it is
+narrower than --precision. A trial passes when p95 and p99 are within the
+thresholds, the error ratio is within --max-error-rate and the achieved
+throughput is within --rate-tolerance of the offered rate (the load generator
+stops sending at the deadline, so a trial above capacity shows a shortfall and
+dropped requests instead of running long).
+
+Example:
+    python station/scripts/capacity_search.py --path /api/agent/agent-type-info-list \
+        --start-rate 50 --max-rate 20000 --trial-duration 30 --build "$GITHUB_SHA"
+"""
+import argparse
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+import benchmark_common
+import load_generator
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate(result, rate, args):
+    """list of SLO violations for one trial (empty when the trial passes)"""
+    violations = []
+    sent = result["TotalEventsSent"]
+    if not result["Success"]:
+        violations.append("no successful requests")
+    if result["P95LatencyMs"] > args.p95_ms:
+        violations.append(f"p95 {result['P95LatencyMs']:.1f}ms > {args.p95_ms}ms")
+    if result["P99LatencyMs"] > args.p99_ms:
+        violations.append(f"p99 {result['P99LatencyMs']:.1f}ms > {args.p99_ms}ms")
+    if sent and result["ErrorCount"] / sent > args.max_error_rate:
+        violations.append(f"error rate {result['ErrorCount'] / sent:.2%} > {args.max_error_rate:.2%}")
+    if result.get("DroppedRequests"):
+        violations.append(f"{result['DroppedRequests']} requests not sent before the deadline")
+    if result["ActualThroughput"] < rate * (1 - args.rate_tolerance):
+        violations.append(f"throughput {result['ActualThroughput']:.1f} < offered {rate:.1f} req/s")
+    return violations
+
+
+def _quiet(elapsed, interval, cumulative):
+    """trials only log their final verdict"""
+
+
+def run_trial(target, rate, args):
+    """one open-loop trial at `rate`; returns the load generator result annotated with the verdict"""
+    if args.trial_warmup > 0:
+        load_generator.run_load(target, args.processes, args.threads, args.trial_warmup, rate=rate,
+                                on_interval=_quiet)
+    result = load_generator.run_load(target, args.processes, args.threads, args.trial_duration, rate=rate,
+                                     on_interval=_quiet)
+    result.pop("Histogram", None)
+    violations = evaluate(result, rate, args)
+    result.update(OfferedRate=rate, Passed=not violations, Violations=violations)
+    logger.info(
+        f"{'✅' if not violations else '❌'} {rate:9.1f} req/s offered | {result['ActualThroughput']:9.1f} achieved | "
+        f"p95 {result['P95LatencyMs']:.1f}ms p99 {result['P99LatencyMs']:.1f}ms | errors {result['ErrorCount']}"
+        + (f" | {'; '.join(violations)}" if violations else ""))
+    return result
+
+
+def search(trial, start_rate, max_rate, growth, precision, max_trials):
+    """
+    Find the highest rate for which `trial(rate)["Passed"]` holds.
+
+    Grows the rate geometrically from `start_rate` until a trial fails (or
+    `max_rate` is reached), then bisects between the last pass and the first
+    failure. Returns (best passing trial or None, all trials in run order).
+    """
+    trials, best = [], None
+    low, high = 0.0, None
+    rate = start_rate
+
+    while len(trials) < max_trials:
+        result = trial(rate)
+        trials.append(result)
+        if result["Passed"]:
+            low, best = rate, result
+        else:
+            high = rate
+
+        if high is None:
+            if rate >= max_rate:
+                break
+            rate = min(rate * growth, max_rate)
+        else:
+            if high - low <= precision * max(low, start_rate):
+                break
+            rate = (low + high) / 2
+    return best, trials
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Highest request rate that stays within the latency SLOs")
+    load_generator.add_target_arguments(parser)
+    parser.add_argument("--p95-ms", type=float, default=float(os.getenv("LAT_P95_MS", "120")))
+    parser.add_argument("--p99-ms", type=float, default=float(os.getenv("LAT_P99_MS", "1000")))
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--rate-tolerance", type=float, default=0.05,
+                        help="max shortfall of achieved vs offered throughput")
+    parser.add_argument("--start-rate", type=float, default=50)
+    parser.add_argument("--max-rate", type=float, default=100000)
+    parser.add_argument("--growth", type=float, default=2.0, help="rate multiplier while trials pass")
+    parser.add_argument("--precision", type=float, default=0.05,
+                        help="stop bisecting once the pass/fail interval is this fraction of the capacity")
+    parser.add_argument("--max-trials", type=int, default=20)
+    parser.add_argument("--trial-duration", type=float, default=30)
+    parser.add_argument("--trial-warmup", type=float, default=5, help="unmeasured seconds at each rate")
+    parser.add_argument("--build", default=os.getenv("GITHUB_SHA", ""), help="build label recorded in the report")
+    parser.add_argument("--history-file", help="append the capacity as one JSON line for tracking across builds")
+    parser.add_argument("--output-file", default="capacity-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    target = load_generator.build_target(args)
+    logger.info(f"🔎 Searching capacity of {target.method} {target.url} "
+                f"(SLO p95 ≤ {args.p95_ms}ms, p99 ≤ {args.p99_ms}ms)")
+
+    best, trials = search(lambda rate: run_trial(target, rate, args), args.start_rate, args.max_rate,
+                          args.growth, args.precision, args.max_trials)
+
+    capacity = {
+        "Build": args.build,
+        "CapacityRps": best["OfferedRate"] if best else 0,
+        "CapacityThroughput": best["ActualThroughput"] if best else 0,
+        "P95LatencyAtCapacityMs": best["P95LatencyMs"] if best else 0,
+        "P99LatencyAtCapacityMs": best["P99LatencyMs"] if best else 0,
+        "Trials": len(trials),
+    }
+    if best:
+        logger.info(f"🏁 Capacity: {capacity['CapacityRps']:.1f} req/s "
+                    f"(p95 {best['P95LatencyMs']:.1f}ms, p99 {best['P99LatencyMs']:.1f}ms) after {len(trials)} trials")
+    else:
+        logger.info(f"🏁 No rate down to {min(t['OfferedRate'] for t in trials):.1f} req/s met the SLOs")
+
+    configuration = {k: v for k, v in vars(args).items() if k != "verbose"}
+    benchmark_common.write_report(args.output_file, configuration, trials, summary=capacity)
+    if args.history_file:
+        with open(args.history_file, "a") as f:
+            f.write(json.dumps({
+                **capacity,
+                "RecordedAt": datetime.now(timezone.utc).isoformat(),
+                "Target": f"{target.method} {target.url}",
+                "SloP95Ms": args.p95_ms,
+                "SloP99Ms": args.p99_ms,
+            }) + "\n")
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if best else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,3 @@
+# conftest.py
+"""pytest hooks shared by the station/scripts suites"""
+from timing_profiler import pytest_addoption, pytest_configure  # noqa: F401
@@ -0,0 +1,263 @@
+# latency_histogram.py
+"""
+HDR-style latency histogram for the Python benchmark harness.
+
+Values are integers in a fixed unit (microseconds by convention) and are kept
+to a configurable number of significant figures across the whole trackable
+range, using the HdrHistogram bucket layout: a run of linear sub-buckets per
+power of two. Counts live in a flat NumPy int64 array, so
+
+* recording is O(1) and allocation free,
+* memory is bounded by the configured range and precision,
+* histograms with the same layout merge losslessly by adding their arrays,
+  including arrays that live in shared memory (see load_generator.py),
+* the counts serialize to a compact zlib-compressed binary / JSON form.
+
+For open-loop runs, `record_corrected_value` applies HdrHistogram's
+coordinated-omission correction: a stall longer than the expected interval
+between requests also records the requests that would have been issued (and
+delayed) during that stall.
+"""
+import base64
+import math
+import struct
+import zlib
+
+import numpy as np
+
+_ENCODING_MAGIC = b"AHH1"
+_ENCODING_HEADER = struct.Struct("<4sQQBI")
+
+
+class LatencyHistogram:
+    """Array-backed histogram tracking values to `significant_figures` precision."""
+
+    def __init__(self, lowest_trackable=1, highest_trackable=3_600_000_000, significant_figures=3,
+                 counts=None):
+        if lowest_trackable < 1:
+            raise ValueError("lowest_trackable must be >= 1")
+        if highest_trackable < 2 * lowest_trackable:
+            raise ValueError("highest_trackable must be >= 2 * lowest_trackable")
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+
+        self.lowest_trackable = int(lowest_trackable)
+        self.highest_trackable = int(highest_trackable)
+        self.significant_figures = int(significant_figures)
+
+        (self._sub_bucket_half_count_magnitude, self._unit_magnitude, self._sub_bucket_count,
+         self.counts_len) = _compute_layout(lowest_trackable, highest_trackable, significant_figures)
+        self._sub_bucket_half_count = self._sub_bucket_count >> 1
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        if counts is not None:
+            if len(counts) != self.counts_len:
+                raise ValueError(f"counts has {len(counts)} slots, layout needs {self.counts_len}")
+            self.counts = counts
+        else:
+            self.counts = np.zeros(self.counts_len, dtype=np.int64)
+        self._values = None
+
+    # ------------------------------------------------------------------
+    # layout
+    # ------------------------------------------------------------------
+    @classmethod
+    def counts_len_for(cls, lowest_trackable=1, highest_trackable=3_600_000_000, significant_figures=3):
+        """number of int64 slots a histogram with this layout needs"""
+        return _compute_layout(lowest_trackable, highest_trackable, significant_figures)[-1]
+
+    def layout(self):
+        return self.lowest_trackable, self.highest_trackable, self.significant_figures
+
+    def like(self, counts=None):
+        """create a histogram with the same layout, optionally wrapping `counts`"""
+        return LatencyHistogram(*self.layout(), counts=counts)
+
+    def counts_index(self, value):
+        """index of the slot that `value` is counted in"""
+        bucket_index = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude \
+            - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) \
+            + (sub_bucket_index - self._sub_bucket_half_count)
+
+    def _slot_values(self):
+        """lowest, highest and median equivalent value of every slot"""
+        if self._values is None:
+            index = np.arange(self.counts_len, dtype=np.int64)
+            bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+            sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+            first = bucket_index < 0
+            sub_bucket_index[first] -= self._sub_bucket_half_count
+            bucket_index[first] = 0
+            lowest = sub_bucket_index << (bucket_index + self._unit_magnitude)
+            width = np.left_shift(np.int64(1), bucket_index + self._unit_magnitude)
+            self._values = (lowest, lowest + width - 1, lowest + (width >> 1))
+        return self._values
+
+    # ------------------------------------------------------------------
+    # recording
+    # ------------------------------------------------------------------
+    def record_value(self, value, count=1):
+        """record `value` (clamped to the trackable range) `count` times"""
+        value = int(value)
+        if value > self.highest_trackable:
+            value = self.highest_trackable
+        elif value < 0:
+            value = 0
+        self.counts[self.counts_index(value)] += count
+
+    def record_corrected_value(self, value, expected_interval, count=1):
+        """
+        record `value` with coordinated-omission correction: when it exceeds
+        `expected_interval`, also record the values the requests queued behind
+        it would have seen (value - interval, value - 2 * interval, ...)
+        """
+        self.record_value(value, count)
+        if expected_interval <= 0:
+            return
+        missing = int(value) - int(expected_interval)
+        while missing >= expected_interval:
+            self.record_value(missing, count)
+            missing -= int(expected_interval)
+
+    def record_values(self, values):
+        """record a NumPy array of values in one vectorized pass"""
+        values = np.clip(np.asarray(values, dtype=np.int64), 0, self.highest_trackable)
+        masked = values | self._sub_bucket_mask
+        # frexp's exponent equals int.bit_length() for positive integers below 2**53
+        bit_length = np.frexp(masked.astype(np.float64))[1].astype(np.int64)
+        bucket_index = bit_length - self._unit_magnitude - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = values >> (bucket_index + self._unit_magnitude)
+        index = ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) \
+            + (sub_bucket_index - self._sub_bucket_half_count)
+        self.counts += np.bincount(index, minlength=self.counts_len)
+
+    def reset(self):
+        self.counts.fill(0)
+
+    # ------------------------------------------------------------------
+    # merging
+    # ------------------------------------------------------------------
+    def add(self, other):
+        """merge `other` (same layout) into this histogram"""
+        if other.layout() != self.layout():
+            raise ValueError(f"cannot merge histogram layout {other.layout()} into {self.layout()}")
+        self.counts += other.counts
+        return self
+
+    def __sub__(self, other):
+        """histogram of the values recorded since `other` was copied from this one"""
+        return self.like(self.counts - other.counts)
+
+    def copy(self):
+        return self.like(self.counts.copy())
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+    @property
+    def total_count(self):
+        return int(self.counts.sum())
+
+    def min(self):
+        nonzero = np.flatnonzero(self.counts)
+        return int(self._slot_values()[0][nonzero[0]]) if len(nonzero) else 0
+
+    def max(self):
+        nonzero = np.flatnonzero(self.counts)
+        return int(self._slot_values()[1][nonzero[-1]]) if len(nonzero) else 0
+
+    def mean(self):
+        total = self.total_count
+        if total == 0:
+            return 0.0
+        return float((self.counts * self._slot_values()[2]).sum()) / total
+
+    def stddev(self):
+        total = self.total_count
+        if total == 0:
+            return 0.0
+        medians = self._slot_values()[2]
+        mean = float((self.counts * medians).sum()) / total
+        return math.sqrt(float((self.counts * (medians - mean) ** 2).sum()) / total)
+
+    def value_at_percentile(self, percentile):
+        """highest value (within precision) that `percentile` percent of recorded values are at or below"""
+        total = self.total_count
+        if total == 0:
+            return 0
+        target = max(1, int(math.ceil(min(percentile, 100.0) / 100.0 * total)))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        return int(self._slot_values()[1][index])
+
+    def values_at_percentiles(self, percentiles):
+        return {p: self.value_at_percentile(p) for p in percentiles}
+
+    def summary(self, scale=1000.0):
+        """
+        latency statistics in the C# BenchmarkResult field names; `scale` converts
+        the recorded unit to milliseconds (1000 for microseconds)
+        """
+        return {
+            "MinLatencyMs": self.min() / scale,
+            "MaxLatencyMs": self.max() / scale,
+            "AverageLatencyMs": self.mean() / scale,
+            "MedianLatencyMs": self.value_at_percentile(50) / scale,
+            "P95LatencyMs": self.value_at_percentile(95) / scale,
+            "P99LatencyMs": self.value_at_percentile(99) / scale,
+            "StandardDeviationMs": self.stddev() / scale,
+        }
+
+    # ------------------------------------------------------------------
+    # serialization
+    # ------------------------------------------------------------------
+    def encode(self):
+        """compact binary form: layout header followed by zlib-compressed counts"""
+        nonzero = np.flatnonzero(self.counts)
+        used = int(nonzero[-1]) + 1 if len(nonzero) else 0
+        payload = zlib.compress(self.counts[:used].astype("<i8").tobytes())
+        header = _ENCODING_HEADER.pack(_ENCODING_MAGIC, self.lowest_trackable, self.highest_trackable,
+                                       self.significant_figures, used)
+        return header + payload
+
+    @classmethod
+    def decode(cls, data):
+        magic, lowest, highest, figures, used = _ENCODING_HEADER.unpack_from(data)
+        if magic != _ENCODING_MAGIC:
+            raise ValueError("not an encoded LatencyHistogram")
+        histogram = cls(lowest, highest, figures)
+        counts = np.frombuffer(zlib.decompress(data[_ENCODING_HEADER.size:]), dtype="<i8")
+        histogram.counts[:used] = counts
+        return histogram
+
+    def to_json(self):
+        """JSON-safe dict carrying the base64 of `encode()`"""
+        return {
+            "lowestTrackable": self.lowest_trackable,
+            "highestTrackable": self.highest_trackable,
+            "significantFigures": self.significant_figures,
+            "totalCount": self.total_count,
+            "encoded": base64.b64encode(self.encode()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.decode(base64.b64decode(data["encoded"]))
+
+
+def _compute_layout(lowest_trackable, highest_trackable, significant_figures):
+    """HdrHistogram bucket layout: (sub-bucket half count magnitude, unit magnitude, sub-bucket count, counts length)"""
+    largest_single_unit = 2 * 10 ** significant_figures
+    sub_bucket_count_magnitude = int(math.ceil(math.log2(largest_single_unit)))
+    sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+    unit_magnitude = int(math.floor(math.log2(lowest_trackable)))
+    sub_bucket_count = 1 << (sub_bucket_half_count_magnitude + 1)
+
+    smallest_untrackable = sub_bucket_count << unit_magnitude
+    bucket_count = 1
+    while smallest_untrackable <= highest_trackable:
+        smallest_untrackable <<= 1
+        bucket_count += 1
+    counts_len = (bucket_count + 1) * (sub_bucket_count >> 1)
+    return sub_bucket_half_count_magnitude, unit_magnitude, sub_bucket_count, counts_len
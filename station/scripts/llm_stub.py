@@ -0,0 +1,196 @@
+# llm_stub.py
+"""
+Local stub LLM backend for offline benchmark runs.
+
+The stub answers OpenAI / Azure OpenAI chat-completion requests
+(`/v1/chat/completions`, `/openai/deployments/{name}/chat/completions`) and,
+for fully offline runs, the two Station endpoints backed by the LLM
+(`/api/workflow/generate`, `/api/workflow/text-completion/generate`).
+Chat requests whose prompt asks for a `{"completions": [...]}` object (the
+TextCompletionGAgent prompt) get five completions; all others get a workflow.
+
+Latency follows a simple provider model: at most `max_concurrency` requests
+are served at once (the rest queue, like a rate-limited deployment), and each
+one takes `base_latency_ms + completion_tokens / tokens_per_second` plus
+uniform jitter. That gives saturation benchmarks a realistic knee without
+calling a real model.
+
+To put a deployed Station in front of the stub, point the silo's
+SystemLLMConfigs endpoint at it, e.g.
+`SystemLLMConfigs__OpenAI__Endpoint=http://<runner-host>:8089/`.
+
+Example:
+    python station/scripts/llm_stub.py --port 8089 --max-concurrency 8 --base-latency-ms 800
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import benchmark_common
+
+logger = logging.getLogger(__name__)
+
+STUB_WORKFLOW = {
+    "name": "stub-workflow",
+    "properties": {
+        "workflowNodeList": [
+            {
+                "agentType": "agenttest",
+                "name": "agenttest",
+                "extendedData": {"xPosition": "1", "yPosition": "1"},
+                "nodeId": "9516a447-ca28-457a-a328-f2019863ebaa",
+                "jsonProperties": "{}"
+            }
+        ],
+        "workflowNodeUnitList": [],
+        "name": "stub-workflow"
+    }
+}
+STUB_COMPLETIONS = [
+    "its effect on everyday work and decision making.",
+    "the way teams collaborate across time zones.",
+    "how businesses measure customer satisfaction.",
+    "the skills people will need over the next decade.",
+    "the questions it raises about privacy and trust.",
+]
+
+
+class LatencyModel:
+    """Bounded-concurrency provider model: queue for a slot, then hold it for the generation time."""
+
+    def __init__(self, max_concurrency, base_latency_ms, jitter_ms, tokens_per_second, completion_tokens):
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.base_latency_ms = base_latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+
+    def serve(self):
+        with self.slots:
+            generation_ms = self.base_latency_ms + 1000.0 * self.completion_tokens / self.tokens_per_second
+            time.sleep(max(0.0, generation_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0)
+
+
+def _wants_completions(request):
+    """whether a chat request comes from TextCompletionGAgent, whose prompt asks for a {"completions": [...]} object"""
+    messages = request.get("messages") if isinstance(request, dict) else None
+    return any('"completions"' in str(message.get("content", "")) for message in messages or []
+               if isinstance(message, dict))
+
+
+def _chat_completion(request):
+    """chat-completion reply: text completions for TextCompletionGAgent, a workflow for everything else"""
+    content = {"completions": STUB_COMPLETIONS} if _wants_completions(request) else STUB_WORKFLOW
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "stub",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(content)},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    # the default listen backlog of 5 resets connections under benchmark bursts
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def make_handler(model):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body go out in separate sends; with Nagle on, keep-alive clients
+        # wait on a delayed ACK (~40ms) for every response
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length)
+            path = self.path.split("?")[0]
+
+            if path.endswith("/chat/completions"):
+                try:
+                    request = json.loads(raw or b"{}")
+                except ValueError:
+                    request = {}
+                body = _chat_completion(request)
+            elif path == "/api/workflow/generate":
+                body = {"data": STUB_WORKFLOW}
+            elif path == "/api/workflow/text-completion/generate":
+                body = {"data": {"completions": STUB_COMPLETIONS}}
+            else:
+                self._send(404, {"error": f"no stub for {path}"})
+                return
+
+            model.serve()
+            self._send(200, body)
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return StubHandler
+
+
+def start_stub(port=0, max_concurrency=8, base_latency_ms=800, jitter_ms=100, tokens_per_second=50,
+               completion_tokens=20):
+    """start the stub on a background thread; returns the server (its URL is `stub_url(server)`)"""
+    model = LatencyModel(max_concurrency, base_latency_ms, jitter_ms, tokens_per_second, completion_tokens)
+    server = StubServer(("127.0.0.1", port), make_handler(model))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def add_stub_arguments(parser):
+    """add the latency model options to an argparse parser"""
+    parser.add_argument("--max-concurrency", type=int, default=8, help="requests the stub serves at once")
+    parser.add_argument("--base-latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--completion-tokens", type=int, default=20)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stub LLM backend")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--bind", default="0.0.0.0")
+    add_stub_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    model = LatencyModel(args.max_concurrency, args.base_latency_ms, args.jitter_ms, args.tokens_per_second,
+                         args.completion_tokens)
+    server = StubServer((args.bind, args.port), make_handler(model))
+    logger.info(f"🤖 Stub LLM listening on {args.bind}:{args.port} ({args.max_concurrency} slots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
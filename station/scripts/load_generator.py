@@ -0,0 +1,304 @@
+# load_generator.py
+"""
+Multiprocess HTTP load generator for the Station API.
+
+A single Python process cannot saturate API_HOST because of the GIL and JSON
+overhead, so the load is fanned out across worker processes, each running a
+few request threads. Every thread records latencies into its own row of a
+fixed-size histogram that lives in shared memory; the coordinator sums the
+rows at every report interval to print live throughput and percentiles,
+without any locking on the hot path.
+
+Example:
+    python station/scripts/load_generator.py \
+        --path /api/agent/agent-type-info-list \
+        --processes 16 --threads 32 --duration 60 --rate 20000
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+import benchmark_common
+from benchmark_common import API_HOST
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+HttpTarget = namedtuple("HttpTarget", ["method", "url", "body", "headers", "timeout"], defaults=(30.0,))
+
+# Latencies are recorded in microseconds, up to 100s, to 2 significant figures
+HISTOGRAM_LAYOUT = (1, 100_000_000, 2)
+
+
+class SharedLatencyHistogram:
+    """LatencyHistogram rows in shared memory, one row per recording thread, plus error and dropped counts per row."""
+
+    def __init__(self, rows, name=None, layout=HISTOGRAM_LAYOUT):
+        self.layout = layout
+        self.rows = rows
+        self.counts_len = LatencyHistogram.counts_len_for(*layout)
+        row_bytes = (self.counts_len + 2) * np.dtype(np.int64).itemsize
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=rows * row_bytes)
+        self._table = np.ndarray((rows, self.counts_len + 2), dtype=np.int64, buffer=self.shm.buf)
+        if self._owner:
+            self._table.fill(0)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def row(self, index):
+        """return (histogram, [errors, dropped] counters) views owned by one recording thread"""
+        return LatencyHistogram(*self.layout, counts=self._table[index, :self.counts_len]), \
+            self._table[index, self.counts_len:]
+
+    def snapshot(self):
+        """merge all rows into a private (histogram, error count) snapshot"""
+        totals = self._table.sum(axis=0)
+        return LatencyHistogram(*self.layout, counts=totals[:self.counts_len]), int(totals[self.counts_len])
+
+    def dropped(self):
+        """open-loop sends that were scheduled before the deadline but never issued"""
+        return int(self._table[:, self.counts_len + 1].sum())
+
+    def close(self):
+        del self._table
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def summarize(histogram, errors):
+    """compute latency statistics in milliseconds from a histogram snapshot"""
+    count = histogram.total_count
+    return {
+        "count": count,
+        "errors": errors,
+        "min": histogram.min() / 1000.0,
+        "mean": histogram.mean() / 1000.0,
+        "p50": histogram.value_at_percentile(50) / 1000.0,
+        "p95": histogram.value_at_percentile(95) / 1000.0,
+        "p99": histogram.value_at_percentile(99) / 1000.0,
+        "max": histogram.max() / 1000.0,
+    }
+
+
+def _drive(row, target, rate, phase, start_at, deadline, stop_event):
+    """
+    request loop for one thread; open loop when rate is set, closed loop otherwise.
+
+    In open loop, latency is measured from the scheduled send time rather than
+    the actual one, so a slow response that delays the following sends is
+    charged to those sends too (coordinated-omission correction). `phase`
+    (0..1) offsets this loop's schedule so the loops do not all fire together.
+    No request is issued after `deadline`: when the server cannot keep up, the
+    sends still owed at that point are counted as dropped instead.
+    """
+    histogram, tallies = row
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    body = target.body.encode() if target.body is not None else None
+
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+    # perf_counter is monotonic but has an arbitrary origin; anchor it to start_at
+    clock_offset = time.perf_counter() - time.time()
+    sent = 0
+    while not stop_event.is_set():
+        if rate:
+            scheduled = start_at + (sent + phase) / rate
+            if scheduled >= deadline:
+                break
+            if time.time() >= deadline:
+                tallies[1] += math.ceil((deadline - start_at) * rate - phase) - sent
+                break
+            delay = scheduled - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            started = scheduled + clock_offset
+        elif time.time() >= deadline:
+            break
+        else:
+            started = time.perf_counter()
+        sent += 1
+
+        try:
+            response = session.request(target.method, target.url, data=body,
+                                       headers=target.headers, timeout=target.timeout, verify=False)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        if ok:
+            histogram.record_value((time.perf_counter() - started) * 1_000_000)
+        else:
+            tallies[0] += 1
+    session.close()
+
+
+def _worker(shm_name, rows, first_row, threads, target, rate, start_at, deadline, stop_event):
+    """worker process entry point: run `threads` request loops against shared histogram rows"""
+    histogram = SharedLatencyHistogram(rows, name=shm_name)
+    workers = [
+        threading.Thread(target=_drive, daemon=True,
+                         args=(histogram.row(first_row + i), target, rate, (first_row + i) / rows,
+                               start_at, deadline, stop_event))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    histogram.close()
+
+
+def run_load(target, processes, threads, duration, rate=None, report_interval=1.0, on_interval=None):
+    """
+    Drive `target` from `processes` x `threads` request loops for `duration` seconds.
+
+    `rate` is the total requests/sec across all loops (open loop); when omitted
+    every loop sends back-to-back (closed loop). `on_interval(elapsed, interval, cumulative)`
+    is called with the interval and cumulative summaries at each report tick.
+    Returns a result dict shaped like the C# BenchmarkResult; the measured window
+    runs until the last in-flight request has completed.
+    """
+    total_threads = processes * threads
+    rate_per_thread = rate / total_threads if rate else None
+    histogram = SharedLatencyHistogram(total_threads)
+    stop_event = multiprocessing.Event()
+    # Give every process time to spawn so they all start sending together
+    start_at = time.time() + 1.0 + 0.05 * processes
+    deadline = start_at + duration
+
+    workers = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(histogram.name, total_threads, p * threads, threads, target,
+                  rate_per_thread, start_at, deadline, stop_event))
+        for p in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start_time = time.time()
+    previous, previous_errors = histogram.snapshot()
+    try:
+        time.sleep(max(0.0, start_at - time.time()))
+        last_tick = start_at
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(max(0.0, min(last_tick + report_interval, deadline) - time.time()))
+            now = time.time()
+            snapshot, snapshot_errors = histogram.snapshot()
+            interval = summarize(snapshot - previous, snapshot_errors - previous_errors)
+            cumulative = summarize(snapshot, snapshot_errors)
+            elapsed = now - start_at
+            interval["throughput"] = (interval["count"] + interval["errors"]) / max(1e-9, now - last_tick)
+            if on_interval:
+                on_interval(elapsed, interval, cumulative)
+            else:
+                logger.info(
+                    f"[{elapsed:6.1f}s] {interval['throughput']:9.1f} req/s | "
+                    f"p50 {cumulative['p50']:.1f}ms p95 {cumulative['p95']:.1f}ms "
+                    f"p99 {cumulative['p99']:.1f}ms | errors {cumulative['errors']}")
+            previous, previous_errors = snapshot, snapshot_errors
+            last_tick = now
+            if now >= deadline:
+                for worker in workers:
+                    worker.join()
+    except KeyboardInterrupt:
+        logger.warning("🛑 Cancellation requested... stopping workers")
+        stop_event.set()
+        for worker in workers:
+            worker.join()
+
+    # requests in flight at the deadline are still recorded, so time until the workers have finished
+    actual_duration = max(1e-9, time.time() - start_at)
+    merged, errors = histogram.snapshot()
+    dropped = histogram.dropped()
+    histogram.close()
+    count = merged.total_count
+
+    return {
+        "ConcurrencyLevel": total_threads,
+        "EventsPerSecond": rate or 0,
+        "DurationSeconds": duration,
+        "StartTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start_time)),
+        "ActualDurationSeconds": actual_duration,
+        "Success": count > 0,
+        "TotalEventsSent": count + errors,
+        "TotalEventsProcessed": count,
+        "ErrorCount": errors,
+        "DroppedRequests": dropped,
+        "ActualThroughput": count / actual_duration,
+        **merged.summary(),
+        "Histogram": merged.to_json(),
+    }
+
+
+def build_target(args):
+    """build the request target from command line arguments"""
+    url = args.url or f"{API_HOST}{args.path}"
+    body = args.body
+    if body and body.startswith("@"):
+        with open(body[1:]) as f:
+            body = f.read()
+    headers = {"Content-Type": "application/json"}
+    if not args.no_auth:
+        headers = benchmark_common.bearer_headers(benchmark_common.fetch_client_token())
+    return HttpTarget(args.method.upper(), url, body, headers, args.request_timeout)
+
+
+def add_target_arguments(parser):
+    """add the request target and worker layout options to an argparse parser"""
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/api/agent/agent-type-info-list", help="path relative to API_HOST")
+    parser.add_argument("--url", help="absolute URL, overrides --path")
+    parser.add_argument("--body", help="JSON request body, or @file to read it from a file")
+    parser.add_argument("--no-auth", action="store_true", help="do not fetch a bearer token")
+    parser.add_argument("--request-timeout", type=float, default=30.0,
+                        help="seconds before a request counts as an error")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--threads", type=int, default=16, help="request threads per process")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multiprocess load generator for the Station API")
+    add_target_arguments(parser)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--rate", type=float, help="total target requests/sec (open loop); closed loop if omitted")
+    parser.add_argument("--report-interval", type=float, default=1.0)
+    parser.add_argument("--output-file", default="load-generator-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    target = build_target(args)
+    logger.info(f"🚀 {target.method} {target.url} with {args.processes} processes x {args.threads} threads")
+
+    result = run_load(target, args.processes, args.threads, args.duration,
+                      rate=args.rate, report_interval=args.report_interval)
+    configuration = {k: v for k, v in vars(args).items() if k != "verbose"}
+    benchmark_common.write_report(args.output_file, configuration, [result])
+    if result["DroppedRequests"]:
+        logger.warning(f"⚠️  {result['DroppedRequests']} scheduled requests were not sent before the deadline; "
+                       f"the target cannot sustain {args.rate} req/s")
+    logger.info(f"📊 {json.dumps(result)}")
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if result["Success"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+# permission_query_benchmark.py
+"""
+Permission-filtered query overhead benchmark.
+
+test_permission in regression_test.py shows that /api/query/es and
+/api/query/es/count filter results by the caller's authorization after
+SetAuthorizedUserEvent. This benchmark seeds permission agents with varied
+authorized-user sets in growing batches and, after every batch, compares the
+latency and throughput of the same queries for the admin user and for a
+restricted user, so the cost of the filter can be tracked as the number of
+authorized agents grows.
+
+The restricted user defaults to the client_credentials token used by the
+regression suite (which is authorized on nothing); pass --restricted-username
+and --restricted-password to use a real user that is authorized on a share of
+the seeded agents.
+
+Example:
+    python station/scripts/permission_query_benchmark.py --levels 100,1000,5000 --concurrency 8
+"""
+import argparse
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import requests
+
+import benchmark_common
+from benchmark_common import API_HOST, ADMIN_USERNAME
+
+logger = logging.getLogger(__name__)
+
+PERMISSION_AGENT = "agentpermissiontest"
+PERMISSION_STATE_NAME = "PermissionAgentState"
+PERMISSION_EVENT_TYPE = "Aevatar.Application.Grains.Agents.TestAgent.SetAuthorizedUserEvent"
+
+QUERY_ENDPOINTS = ["/api/query/es", "/api/query/es/count"]
+
+
+def get_user_id(headers, username):
+    """look up a user id by username (requires admin headers)"""
+    response = requests.get(
+        f"{API_HOST}/api/identity/users/by-username/{username}",
+        headers=headers,
+        verify=False
+    )
+    response.raise_for_status()
+    return response.json()["data"]["id"]
+
+
+def seed_agent(session, headers, authorized_user_ids):
+    """create one permission agent and authorize every user in `authorized_user_ids` on it, as test_permission does"""
+    response = session.post(
+        f"{API_HOST}/api/agent",
+        json={"agentType": PERMISSION_AGENT, "name": "permission benchmark agent"},
+        headers=headers,
+        verify=False
+    )
+    response.raise_for_status()
+    agent_id = response.json()["data"]["id"]
+
+    response = session.post(
+        f"{API_HOST}/api/agent/{agent_id}/add-subagent",
+        json={"subAgents": [agent_id]},
+        headers=headers,
+        verify=False
+    )
+    response.raise_for_status()
+
+    for user_id in authorized_user_ids:
+        response = session.post(
+            f"{API_HOST}/api/agent/publishEvent",
+            json={
+                "agentId": agent_id,
+                "eventType": PERMISSION_EVENT_TYPE,
+                "eventProperties": {"UserId": user_id}
+            },
+            headers=headers,
+            verify=False
+        )
+        response.raise_for_status()
+    return agent_id
+
+
+def seed_agents(headers, count, admin_id, restricted_id, restricted_share, extra_users_max, concurrency, rng):
+    """seed `count` agents in parallel; every agent authorizes the admin plus a varied set of other users"""
+    user_sets = []
+    for _ in range(count):
+        users = [admin_id]
+        if restricted_id and rng.random() < restricted_share:
+            users.append(restricted_id)
+        users.extend(str(uuid4()) for _ in range(rng.randint(0, extra_users_max)))
+        user_sets.append(users)
+
+    def seed(users):
+        with requests.Session() as session:
+            return seed_agent(session, headers, users)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(seed, user_sets))
+
+
+def count_indexed(headers, agent_ids, chunk_size=50):
+    """number of `agent_ids` visible to `headers` through /api/query/es/count"""
+    total = 0
+    for start in range(0, len(agent_ids), chunk_size):
+        chunk = agent_ids[start:start + chunk_size]
+        response = requests.get(
+            f"{API_HOST}/api/query/es/count",
+            params={"stateName": PERMISSION_STATE_NAME, "queryString": f"_id:({' OR '.join(chunk)})"},
+            headers=headers,
+            verify=False
+        )
+        response.raise_for_status()
+        total += response.json()["data"]["count"]
+    return total
+
+
+def wait_for_index(headers, agent_ids, timeout, poll_interval=1.0):
+    """poll until the admin sees every seeded agent; raises RuntimeError after `timeout` seconds"""
+    deadline = time.monotonic() + timeout
+    while True:
+        indexed = count_indexed(headers, agent_ids)
+        if indexed == len(agent_ids):
+            return
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"only {indexed} of {len(agent_ids)} seeded agents are indexed after {timeout}s")
+        time.sleep(poll_interval)
+
+
+def delete_agents(headers, agent_ids, concurrency):
+    def delete(agent_id):
+        requests.delete(f"{API_HOST}/api/agent/{agent_id}", headers=headers, verify=False)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(delete, agent_ids))
+
+
+def query_request(endpoint, headers, query_string, page_size):
+    """build a run_closed_loop request callable for one query endpoint"""
+    params = {"stateName": PERMISSION_STATE_NAME, "queryString": query_string}
+    if endpoint.endswith("/es"):
+        params["pageSize"] = page_size
+
+    def request(session):
+        response = session.get(f"{API_HOST}{endpoint}", params=params, headers=headers, verify=False)
+        return response.status_code == 200
+
+    return request
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Permission-filtered query overhead benchmark")
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[10, 100, 1000],
+                        help="cumulative number of seeded authorized agents to measure at")
+    parser.add_argument("--extra-users-max", type=int, default=5,
+                        help="max random extra users authorized per agent (varies the authorized-user sets)")
+    parser.add_argument("--restricted-username", help="password-grant user measured as the restricted user")
+    parser.add_argument("--restricted-password")
+    parser.add_argument("--restricted-share", type=float, default=0.5,
+                        help="share of seeded agents the restricted user is authorized on")
+    parser.add_argument("--query-string", default="*")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="seconds per user/endpoint/level")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--seed-concurrency", type=int, default=16)
+    parser.add_argument("--index-wait", type=float, default=60,
+                        help="max seconds to wait until every seeded agent is indexed")
+    parser.add_argument("--keep-agents", action="store_true", help="do not delete the seeded agents")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output-file", default="permission-query-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    rng = random.Random(args.random_seed)
+
+    client_headers = benchmark_common.bearer_headers(benchmark_common.fetch_client_token())
+    admin_headers = benchmark_common.bearer_headers(benchmark_common.fetch_admin_token())
+    admin_id = get_user_id(admin_headers, ADMIN_USERNAME)
+    if args.restricted_username:
+        restricted_headers = benchmark_common.bearer_headers(
+            benchmark_common.fetch_password_token(args.restricted_username, args.restricted_password))
+        restricted_id = get_user_id(admin_headers, args.restricted_username)
+    else:
+        restricted_headers, restricted_id = client_headers, None
+    users = {"admin": admin_headers, "restricted": restricted_headers}
+
+    seeded, results = [], []
+    try:
+        for level in args.levels:
+            missing = level - len(seeded)
+            if missing > 0:
+                logger.info(f"🌱 Seeding {missing} permission agents (total {level})")
+                seeded += seed_agents(client_headers, missing, admin_id, restricted_id, args.restricted_share,
+                                      args.extra_users_max, args.seed_concurrency, rng)
+            wait_for_index(admin_headers, seeded, args.index_wait)
+
+            for endpoint in QUERY_ENDPOINTS:
+                by_user = {}
+                for user, headers in users.items():
+                    request = query_request(endpoint, headers, args.query_string, args.page_size)
+                    result = benchmark_common.run_closed_loop(request, args.concurrency, args.duration, args.warmup)
+                    result.update(User=user, Endpoint=endpoint, AuthorizedAgents=len(seeded))
+                    results.append(result)
+                    by_user[user] = result
+                    logger.info(
+                        f"{len(seeded):6d} agents | {endpoint:20s} | {user:10s} | "
+                        f"{result['ActualThroughput']:8.1f} req/s | p50 {result['MedianLatencyMs']:.1f}ms "
+                        f"p95 {result['P95LatencyMs']:.1f}ms p99 {result['P99LatencyMs']:.1f}ms")
+                if by_user["admin"]["P95LatencyMs"] > 0:
+                    overhead = by_user["restricted"]["P95LatencyMs"] / by_user["admin"]["P95LatencyMs"]
+                    by_user["restricted"]["P95OverheadVsAdmin"] = overhead
+                    logger.info(f"📊 restricted/admin p95 ratio on {endpoint}: {overhead:.2f}x")
+    finally:
+        if seeded and not args.keep_agents:
+            logger.info(f"🧹 Deleting {len(seeded)} seeded agents")
+            delete_agents(client_headers, seeded, args.seed_concurrency)
+
+    configuration = {k: v for k, v in vars(args).items() if k not in ("verbose", "restricted_password")}
+    benchmark_common.write_report(args.output_file, configuration, results)
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if results and all(r["Success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
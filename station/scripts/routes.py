@@ -0,0 +1,18 @@
+# routes.py
+"""
+Route normalization shared by timing_profiler.py and traffic_trace.py.
+
+Kept free of imports with side effects (no requests, numpy or warning filters)
+so the pytest plugin can load it on every run.
+"""
+import re
+from urllib.parse import urlparse
+
+_ID_SEGMENT = re.compile(r"^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+                         r"|[0-9a-fA-F]{16,}|\d+)$")
+
+
+def route_of(method, url):
+    """`METHOD /path` with id-like path segments replaced by {id}"""
+    segments = [("{id}" if _ID_SEGMENT.match(s) else s) for s in urlparse(url).path.split("/")]
+    return f"{method.upper()} {'/'.join(segments) or '/'}"
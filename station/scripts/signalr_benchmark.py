@@ -0,0 +1,488 @@
+# signalr_benchmark.py
+"""
+SignalR benchmarks for aevatarHub.
+
+`send_event_and_wait` in regression_test_signalr.py sends one
+PublishEventAsync and blocks until a response arrives, so it only measures
+one-at-a-time behaviour. The `pipeline` scenario keeps a configurable window
+of PublishEventAsync invocations in flight over a single connection, matches
+each ReceiveResponse back to its invocation through a token carried in the
+event's Greeting (SignalRTestGAgent echoes it as the response Message), and
+reports sustained messages/sec and latency for every window size, which shows
+the hub's per-connection throughput ceiling.
+
+The `reconnect-storm` scenario exercises `with_automatic_reconnect`: it opens
+many connections, drops them all at once (by killing each client transport,
+or by running a hub restart command), and reports the time-to-reconnect
+distribution, probe messages lost during the gap, and probe latency before
+versus during recovery as a measure of server load, per reconnect policy.
+
+Example:
+    python station/scripts/signalr_benchmark.py pipeline --windows 1,4,16,64 --duration 30
+    python station/scripts/signalr_benchmark.py reconnect-storm --connections 500 \
+        --policies "0,2000,10000,30000;0,500,1000,5000"
+"""
+import argparse
+import json
+import logging
+import socket
+import subprocess
+import threading
+import time
+from uuid import uuid4
+
+from signalrcore.hub_connection_builder import HubConnectionBuilder
+
+import benchmark_common
+from benchmark_common import API_HOST
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+HUB_URL = f"{API_HOST}/api/agent/aevatarHub"
+GRAIN_TYPE = "Aevatar.Application.Grains.Agents.TestAgent.SignalRTestGAgent"
+EVENT_TYPE_NAME = "Aevatar.Application.Grains.Agents.TestAgent.NaiveTestEvent"
+DEFAULT_RECONNECT_INTERVALS = [0, 2000, 10000, 30000]
+
+
+def build_connection(hub_url=HUB_URL, reconnect_intervals=None):
+    """build a hub connection configured like the regression_test_signalr fixture"""
+    builder = HubConnectionBuilder().with_url(hub_url, options={"verify_ssl": False})
+    if reconnect_intervals is not None:
+        builder = builder.with_automatic_reconnect({
+            "type": "raw",
+            "keep_attempting": True,
+            "retries": 1,
+            "intervals": reconnect_intervals,
+        })
+    return builder.configure_logging(logging.WARNING).build()
+
+
+def start_connection(connection, timeout=30, on_reconnect=None):
+    """
+    start `connection` and wait until it is open; returns the shared state dict.
+    `on_reconnect` is called whenever the connection comes back after the first open.
+    """
+    state = {"is_connected": False, "opened": threading.Event()}
+
+    def on_open():
+        state["is_connected"] = True
+        if state["opened"].is_set() and on_reconnect:
+            on_reconnect()
+        state["opened"].set()
+
+    def on_reconnected():
+        state["is_connected"] = True
+        if on_reconnect:
+            on_reconnect()
+
+    def on_close():
+        state["is_connected"] = False
+
+    connection.on_open(on_open)
+    connection.on_close(on_close)
+    connection.on_reconnect(on_reconnected)
+    connection.start()
+    if not state["opened"].wait(timeout):
+        raise TimeoutError(f"Failed to establish SignalR connection to {HUB_URL} within {timeout}s")
+    return state
+
+
+def stop_connection(connection, timeout=2):
+    """
+    stop `connection`; signalrcore can block forever joining a receive thread
+    that sits in recv() after a reconnect, so unblock it by shutting the socket
+    down once the graceful stop has had `timeout` seconds
+    """
+    sock = _transport_socket(connection)
+    # stop() closes the socket itself; a duplicate keeps it reachable for shutdown()
+    spare = sock.dup() if sock is not None else None
+    stopper = threading.Thread(target=connection.stop, daemon=True)
+    stopper.start()
+    stopper.join(timeout)
+    if spare is not None:
+        if stopper.is_alive():
+            _shutdown(spare)
+            stopper.join(timeout)
+        spare.close()
+
+
+def publish_params(token, grain_key=None):
+    """PublishEventAsync arguments carrying `token` in the event Greeting"""
+    grain_key = grain_key or str(uuid4()).replace("-", "")
+    event_json = json.dumps({"Greeting": token})
+    return [f"{GRAIN_TYPE}/{grain_key}", EVENT_TYPE_NAME, event_json]
+
+
+def find_token(arguments, run_id):
+    """extract the `bench-<run_id>-<n>` token echoed back in a ReceiveResponse payload"""
+    payload = json.dumps(arguments)
+    marker = f"bench-{run_id}-"
+    start = payload.find(marker)
+    if start < 0:
+        return None
+    end = start + len(marker)
+    while end < len(payload) and payload[end].isdigit():
+        end += 1
+    return payload[start:end]
+
+
+class PipelineTracker:
+    """Tracks in-flight PublishEventAsync invocations and matches ReceiveResponse messages to them."""
+
+    def __init__(self, run_id, window):
+        self.run_id = run_id
+        self.window = threading.BoundedSemaphore(window)
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.response_latency = LatencyHistogram()
+        self.ack_latency = LatencyHistogram()
+        self.sent = 0
+        self.completed = 0
+        self.lost = 0
+        self.unmatched = 0
+
+    def next_token(self):
+        self.sent += 1
+        return f"bench-{self.run_id}-{self.sent}"
+
+    def on_sent(self, token):
+        with self.lock:
+            self.pending[token] = time.perf_counter()
+
+    def on_ack(self, token, sent_at):
+        self.ack_latency.record_value((time.perf_counter() - sent_at) * 1_000_000)
+
+    def on_response(self, arguments):
+        now = time.perf_counter()
+        token = find_token(arguments, self.run_id)
+        with self.lock:
+            sent_at = self.pending.pop(token, None)
+        if sent_at is None:
+            self.unmatched += 1
+            return
+        self.response_latency.record_value((now - sent_at) * 1_000_000)
+        self.completed += 1
+        self.window.release()
+
+    def expire(self, timeout):
+        """give up on invocations older than `timeout` seconds and free their window slots"""
+        cutoff = time.perf_counter() - timeout
+        with self.lock:
+            expired = [token for token, sent_at in self.pending.items() if sent_at < cutoff]
+            for token in expired:
+                del self.pending[token]
+        for _ in expired:
+            self.lost += 1
+            self.window.release()
+
+
+def run_pipeline_level(connection, tracker, duration, response_timeout, grain_keys=None):
+    """keep `tracker.window` invocations in flight for `duration` seconds"""
+    deadline = time.perf_counter() + duration
+    next_expire = time.perf_counter() + 1.0
+    while time.perf_counter() < deadline:
+        if time.perf_counter() >= next_expire:
+            tracker.expire(response_timeout)
+            next_expire = time.perf_counter() + 1.0
+        if not tracker.window.acquire(timeout=0.1):
+            continue
+        token = tracker.next_token()
+        grain_key = grain_keys[tracker.sent % len(grain_keys)] if grain_keys else None
+        tracker.on_sent(token)
+        sent_at = time.perf_counter()
+        connection.send("PublishEventAsync", publish_params(token, grain_key),
+                        on_invocation=lambda _, token=token, sent_at=sent_at: tracker.on_ack(token, sent_at))
+
+    # Drain what is still in flight so the next level starts from an empty window
+    drain_deadline = time.perf_counter() + response_timeout
+    while tracker.pending and time.perf_counter() < drain_deadline:
+        time.sleep(0.05)
+    tracker.expire(0)
+
+
+def run_pipeline(windows, duration, warmup, response_timeout, key_pool):
+    """run the pipelined publish scenario once per window size over one connection"""
+    connection = build_connection()
+    current = {"tracker": None}
+    connection.on("ReceiveResponse", lambda arguments: current["tracker"] and current["tracker"].on_response(arguments))
+    start_connection(connection)
+
+    grain_keys = [str(uuid4()).replace("-", "") for _ in range(key_pool)] if key_pool else None
+    results = []
+    try:
+        for window in windows:
+            if warmup > 0:
+                current["tracker"] = PipelineTracker(uuid4().hex[:8], window)
+                run_pipeline_level(connection, current["tracker"], warmup, response_timeout, grain_keys)
+
+            tracker = PipelineTracker(uuid4().hex[:8], window)
+            current["tracker"] = tracker
+            started = time.perf_counter()
+            run_pipeline_level(connection, tracker, duration, response_timeout, grain_keys)
+            elapsed = time.perf_counter() - started
+
+            result = {
+                "ConcurrencyLevel": window,
+                "DurationSeconds": duration,
+                "ActualDurationSeconds": elapsed,
+                "Success": tracker.completed > 0,
+                "TotalEventsSent": tracker.sent,
+                "TotalEventsProcessed": tracker.completed,
+                "LostResponses": tracker.lost,
+                "UnmatchedResponses": tracker.unmatched,
+                "ActualThroughput": tracker.completed / elapsed,
+                **tracker.response_latency.summary(),
+                "AckLatency": tracker.ack_latency.summary(),
+            }
+            results.append(result)
+            logger.info(
+                f"window {window:5d} | {result['ActualThroughput']:9.1f} msg/s | "
+                f"p50 {result['MedianLatencyMs']:.1f}ms p95 {result['P95LatencyMs']:.1f}ms "
+                f"p99 {result['P99LatencyMs']:.1f}ms | lost {tracker.lost}")
+    finally:
+        stop_connection(connection)
+    return results
+
+
+def kill_transport(connection):
+    """
+    drop the connection's socket without a close handshake, the way a hub pod
+    restart looks from the client, so the automatic reconnect policy kicks in
+    """
+    sock = _transport_socket(connection)
+    if sock is None:
+        raise RuntimeError("cannot locate the SignalR transport socket to kill")
+    _shutdown(sock)
+
+
+def _transport_socket(connection):
+    transport = connection.transport
+    # signalrcore >= 1.0 keeps its own socket client; 0.9.x wraps websocket-client's WebSocketApp
+    client = getattr(transport, "_client", None) or getattr(transport, "_ws", None)
+    sock = getattr(client, "sock", None)
+    sock = getattr(sock, "sock", sock)
+    return sock if isinstance(sock, socket.socket) and sock.fileno() >= 0 else None
+
+
+def _shutdown(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class StormClient:
+    """One hub connection taking part in a reconnect storm."""
+
+    def __init__(self, intervals, probes):
+        self.connection = build_connection(reconnect_intervals=intervals)
+        self.connection.on("ReceiveResponse", probes.on_response)
+        self.disconnected_at = None
+        self.reconnected_at = None
+        self.reconnected = threading.Event()
+
+    def start(self, timeout):
+        start_connection(self.connection, timeout, on_reconnect=self._on_reconnect)
+
+    def _on_reconnect(self):
+        if self.disconnected_at is not None and not self.reconnected.is_set():
+            self.reconnected_at = time.perf_counter()
+            self.reconnected.set()
+
+    def mark_disconnected(self, at):
+        self.disconnected_at = at
+        self.reconnected_at = None
+        self.reconnected.clear()
+
+
+class ProbeTracker:
+    """Probe PublishEventAsync traffic sent by every storm client, split into baseline and recovery phases."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.sequence = 0
+        self.phase = "baseline"
+        self.latency = {"baseline": LatencyHistogram(), "recovery": LatencyHistogram()}
+        self.sent = {"baseline": 0, "recovery": 0}
+        self.send_errors = {"baseline": 0, "recovery": 0}
+        self.answered = {"baseline": 0, "recovery": 0}
+
+    def send(self, connection):
+        with self.lock:
+            self.sequence += 1
+            token = f"bench-{self.run_id}-{self.sequence}"
+            phase = self.phase
+            self.sent[phase] += 1
+            self.pending[token] = (time.perf_counter(), phase)
+        try:
+            connection.send("PublishEventAsync", publish_params(token))
+        except Exception:
+            with self.lock:
+                self.pending.pop(token, None)
+                self.send_errors[phase] += 1
+
+    def on_response(self, arguments):
+        now = time.perf_counter()
+        token = find_token(arguments, self.run_id)
+        with self.lock:
+            entry = self.pending.pop(token, None)
+            if entry is None:
+                return
+            sent_at, phase = entry
+            self.answered[phase] += 1
+        self.latency[phase].record_value((now - sent_at) * 1_000_000)
+
+    def lost(self, phase):
+        return self.sent[phase] - self.send_errors[phase] - self.answered[phase]
+
+
+def _probe_loop(clients, probes, interval, stop_event):
+    """send one probe per client every `interval` seconds until stopped"""
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        for client in clients:
+            if stop_event.is_set():
+                break
+            probes.send(client.connection)
+        stop_event.wait(max(0.0, interval - (time.perf_counter() - started)))
+
+
+def run_reconnect_storm(intervals, connections, connect_rate, baseline, reconnect_timeout, settle,
+                        probe_interval, response_timeout, restart_command=None):
+    """
+    open `connections` hub connections using the reconnect `intervals` policy, drop them all at once
+    (or run `restart_command` to restart the hub), and measure how the fleet recovers
+    """
+    probes = ProbeTracker(uuid4().hex[:8])
+    clients = [StormClient(intervals, probes) for _ in range(connections)]
+    logger.info(f"🔌 Opening {connections} connections (policy {intervals})")
+    for client in clients:
+        client.start(timeout=30)
+        time.sleep(1.0 / connect_rate)
+
+    stop_probes = threading.Event()
+    prober = threading.Thread(target=_probe_loop, args=(clients, probes, probe_interval, stop_probes), daemon=True)
+    prober.start()
+    try:
+        time.sleep(baseline)
+        with probes.lock:
+            probes.phase = "recovery"
+
+        storm_at = time.perf_counter()
+        for client in clients:
+            client.mark_disconnected(storm_at)
+        if restart_command:
+            logger.info(f"💥 Restarting hub: {restart_command}")
+            subprocess.run(restart_command, shell=True, check=True)
+        else:
+            logger.info(f"💥 Killing {connections} transports")
+            for client in clients:
+                kill_transport(client.connection)
+
+        deadline = storm_at + reconnect_timeout
+        for client in clients:
+            client.reconnected.wait(max(0.0, deadline - time.perf_counter()))
+        time.sleep(settle)
+    finally:
+        stop_probes.set()
+        prober.join()
+        time.sleep(min(response_timeout, 5))
+        stoppers = [threading.Thread(target=stop_connection, args=(client.connection,)) for client in clients]
+        for stopper in stoppers:
+            stopper.start()
+        for stopper in stoppers:
+            stopper.join()
+
+    reconnect_time = LatencyHistogram()
+    for client in clients:
+        if client.reconnected_at is not None:
+            reconnect_time.record_value((client.reconnected_at - client.disconnected_at) * 1_000_000)
+    reconnected = reconnect_time.total_count
+
+    return {
+        "ReconnectIntervalsMs": intervals,
+        "ConcurrencyLevel": connections,
+        "Success": reconnected == connections,
+        "Reconnected": reconnected,
+        "NotReconnected": connections - reconnected,
+        "ReconnectTime": reconnect_time.summary(),
+        "ProbesSent": probes.sent["recovery"],
+        "ProbeSendErrors": probes.send_errors["recovery"],
+        "ProbesLost": probes.lost("recovery"),
+        "BaselineProbeLatency": probes.latency["baseline"].summary(),
+        "RecoveryProbeLatency": probes.latency["recovery"].summary(),
+        "BaselineProbesLost": probes.lost("baseline"),
+    }
+
+
+def _policy_list(value):
+    """parse `0,2000,10000;0,500` into [[0, 2000, 10000], [0, 500]]"""
+    return [_int_list(policy) for policy in value.split(";") if policy]
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SignalR benchmarks for aevatarHub")
+    parser.add_argument("--output-file", help="report file (defaults to signalr-<scenario>-results.json)")
+    parser.add_argument("--verbose", action="store_true")
+    scenarios = parser.add_subparsers(dest="scenario", required=True)
+
+    pipeline = scenarios.add_parser("pipeline", help="pipelined PublishEventAsync throughput vs in-flight window")
+    pipeline.add_argument("--windows", type=_int_list, default=[1, 2, 4, 8, 16, 32, 64, 128])
+    pipeline.add_argument("--duration", type=float, default=30, help="seconds per window size")
+    pipeline.add_argument("--warmup", type=float, default=5, help="warmup seconds per window size")
+    pipeline.add_argument("--response-timeout", type=float, default=30,
+                          help="seconds before an unanswered invocation counts as lost")
+    pipeline.add_argument("--key-pool", type=int, default=0,
+                          help="reuse this many grain keys instead of a fresh key per message")
+    storm = scenarios.add_parser("reconnect-storm", help="drop many connections at once and measure recovery")
+    storm.add_argument("--policies", type=_policy_list, default=[DEFAULT_RECONNECT_INTERVALS],
+                       help="reconnect interval policies in ms, e.g. '0,2000,10000,30000;0,500,1000'")
+    storm.add_argument("--connections", type=int, default=200)
+    storm.add_argument("--connect-rate", type=float, default=50, help="new connections per second")
+    storm.add_argument("--baseline", type=float, default=10, help="seconds of probe traffic before the storm")
+    storm.add_argument("--reconnect-timeout", type=float, default=120)
+    storm.add_argument("--settle", type=float, default=10, help="seconds of probe traffic after recovery")
+    storm.add_argument("--probe-interval", type=float, default=1.0, help="seconds between probes per connection")
+    storm.add_argument("--response-timeout", type=float, default=30)
+    storm.add_argument("--restart-command",
+                       help="shell command that restarts the hub (e.g. a kubectl rollout restart) "
+                            "instead of killing client transports")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    output_file = args.output_file or f"signalr-{args.scenario}-results.json"
+    configuration = {k: v for k, v in vars(args).items() if k not in ("verbose", "output_file")}
+
+    if args.scenario == "pipeline":
+        logger.info(f"🚀 Pipelined PublishEventAsync against {HUB_URL}, windows {args.windows}")
+        results = run_pipeline(args.windows, args.duration, args.warmup, args.response_timeout, args.key_pool)
+        best = max(results, key=lambda r: r["ActualThroughput"])
+        logger.info(f"📈 Per-connection ceiling: {best['ActualThroughput']:.1f} msg/s at window {best['ConcurrencyLevel']}")
+    elif args.scenario == "reconnect-storm":
+        results = []
+        for policy in args.policies:
+            result = run_reconnect_storm(policy, args.connections, args.connect_rate, args.baseline,
+                                         args.reconnect_timeout, args.settle, args.probe_interval,
+                                         args.response_timeout, args.restart_command)
+            results.append(result)
+            reconnect = result["ReconnectTime"]
+            logger.info(
+                f"policy {policy} | reconnected {result['Reconnected']}/{args.connections} | "
+                f"p50 {reconnect['MedianLatencyMs']:.0f}ms p99 {reconnect['P99LatencyMs']:.0f}ms "
+                f"max {reconnect['MaxLatencyMs']:.0f}ms | probes lost {result['ProbesLost']} "
+                f"send errors {result['ProbeSendErrors']}")
+
+    benchmark_common.write_report(output_file, configuration, results)
+    logger.info(f"📁 Results written to {output_file}")
+    return 0 if all(r["Success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
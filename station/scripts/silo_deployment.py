@@ -0,0 +1,201 @@
+# silo_deployment.py
+"""
+Parallel silo deployment copies with progress tracking and timing.
+
+test_silo_deployment_operations in regression_test.py calls
+/api/users/CopyDeploymentWithPattern on API_SERVER_HOST once per silo pattern,
+serially. This helper issues the copies for many pattern/version pairs
+concurrently with bounded parallelism, polls Kubernetes until every copied
+deployment is rolled out and ready, and reports per-pattern time-to-ready.
+Each run can be appended to a JSON-lines history file tagged with a release
+label, so rollout latency can be tracked across releases.
+
+Readiness is read with `kubectl get deployment`, so polling needs kubectl
+configured for the cluster; pass --no-wait to only time the copy calls.
+
+Example:
+    python station/scripts/silo_deployment.py \
+        --deployment Scheduler:scheduler-v2 --deployment User:user-v2 \
+        --namespace aevatar-webhook --parallelism 4 --release 1.4.0
+"""
+import argparse
+import json
+import logging
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import requests
+
+import benchmark_common
+from benchmark_common import API_SERVER_HOST, CLIENT_ID
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEPLOYMENTS = ["Scheduler:scheduler-v1", "User:user-v1"]
+
+
+def deployment_name(client_id, version):
+    """deployment name KubernetesHostManager gives a copied silo (deployment-{clientId}-silo-{version})"""
+    return f"deployment-{client_id}-silo-{version}".replace("_", "-").lower()
+
+
+def copy_deployment(headers, client_id, source_version, target_version, pattern):
+    """call CopyDeploymentWithPattern; returns the request duration in seconds"""
+    started = time.perf_counter()
+    response = requests.post(
+        f"{API_SERVER_HOST}/api/users/CopyDeploymentWithPattern",
+        params={
+            "clientId": client_id,
+            "sourceVersion": source_version,
+            "targetVersion": target_version,
+            "siloNamePattern": pattern
+        },
+        headers=headers,
+        verify=False
+    )
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def deployment_status(name, namespace):
+    """(ready replicas, desired replicas, rolled out) for a deployment, or None if it does not exist yet"""
+    completed = subprocess.run(
+        ["kubectl", "get", "deployment", name, "-n", namespace, "-o", "json"],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return None
+    deployment = json.loads(completed.stdout)
+    spec, status = deployment.get("spec", {}), deployment.get("status", {})
+    desired = spec.get("replicas", 1)
+    ready = status.get("readyReplicas", 0)
+    rolled_out = status.get("observedGeneration", 0) >= deployment["metadata"].get("generation", 0) \
+        and status.get("updatedReplicas", 0) >= desired \
+        and status.get("availableReplicas", 0) >= desired
+    return ready, desired, rolled_out
+
+
+def wait_until_ready(name, namespace, timeout, poll_interval, on_progress=None):
+    """poll `name` until it is rolled out and ready; returns True when ready within `timeout` seconds"""
+    deadline = time.perf_counter() + timeout
+    last = None
+    while time.perf_counter() < deadline:
+        status = deployment_status(name, namespace)
+        if status != last and on_progress:
+            on_progress(status)
+        last = status
+        if status and status[2] and status[0] >= status[1]:
+            return True
+        time.sleep(poll_interval)
+    return False
+
+
+class RolloutProgress:
+    """Thread-safe progress board printed as copies and rollouts advance, keyed by (pattern, version)."""
+
+    def __init__(self, deployments):
+        self.lock = threading.Lock()
+        self.states = {deployment: "queued" for deployment in deployments}
+
+    def update(self, deployment, state):
+        with self.lock:
+            self.states[deployment] = state
+            done = sum(1 for s in self.states.values() if s in ("ready", "failed", "copied"))
+            pattern, version = deployment
+            logger.info(f"[{done}/{len(self.states)}] {pattern}:{version}: {state}")
+
+
+def roll_out(deployment, headers, args, progress):
+    """copy one pattern/version and wait for it; returns its timing record"""
+    pattern, version = deployment
+    name = deployment_name(args.client_id, version)
+    record = {"Pattern": pattern, "TargetVersion": version, "Deployment": name, "Success": False}
+    started = time.perf_counter()
+    try:
+        progress.update(deployment, "copying")
+        record["CopyRequestSeconds"] = copy_deployment(headers, args.client_id, args.source_version, version, pattern)
+        if args.no_wait:
+            progress.update(deployment, "copied")
+            record["Success"] = True
+            return record
+
+        def on_progress(status):
+            if status is None:
+                progress.update(deployment, "waiting for deployment")
+            else:
+                progress.update(deployment, f"{status[0]}/{status[1]} replicas ready")
+
+        record["Success"] = wait_until_ready(name, args.namespace, args.ready_timeout, args.poll_interval, on_progress)
+        record["TimeToReadySeconds"] = time.perf_counter() - started
+        progress.update(deployment, "ready" if record["Success"] else "failed")
+    except (requests.RequestException, OSError) as e:
+        record["Error"] = str(e)
+        progress.update(deployment, "failed")
+    return record
+
+
+def parse_deployment(value):
+    pattern, _, version = value.partition(":")
+    if not pattern or not version:
+        raise argparse.ArgumentTypeError(f"expected PATTERN:VERSION, got {value!r}")
+    return pattern, version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel silo deployment copies with time-to-ready tracking")
+    parser.add_argument("--deployment", dest="deployments", action="append", type=parse_deployment,
+                        help="PATTERN:VERSION to copy, repeatable (default: Scheduler:scheduler-v1, User:user-v1)")
+    parser.add_argument("--client-id", default=CLIENT_ID)
+    parser.add_argument("--source-version", default="1")
+    parser.add_argument("--parallelism", type=int, default=4, help="max copies in flight")
+    parser.add_argument("--namespace", default="aevatar-webhook", help="Kubernetes namespace of the silo deployments")
+    parser.add_argument("--ready-timeout", type=float, default=600)
+    parser.add_argument("--poll-interval", type=float, default=5)
+    parser.add_argument("--no-wait", action="store_true", help="only time the copy requests, do not poll readiness")
+    parser.add_argument("--release", help="release label recorded in the history file")
+    parser.add_argument("--history-file", help="append this run as one JSON line for tracking across releases")
+    parser.add_argument("--output-file", default="silo-deployment-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    deployments = args.deployments or [parse_deployment(d) for d in DEFAULT_DEPLOYMENTS]
+    headers = benchmark_common.bearer_headers(benchmark_common.fetch_admin_token())
+    progress = RolloutProgress(deployments)
+
+    logger.info(f"🚀 Copying {len(deployments)} silo deployments with parallelism {args.parallelism}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.parallelism) as pool:
+        futures = [pool.submit(roll_out, deployment, headers, args, progress) for deployment in deployments]
+        records = [future.result() for future in as_completed(futures)]
+    total_seconds = time.perf_counter() - started
+
+    records.sort(key=lambda r: r.get("TimeToReadySeconds", r.get("CopyRequestSeconds", 0)), reverse=True)
+    for record in records:
+        logger.info(
+            f"{record['Pattern']:12s} {record['TargetVersion']:16s} "
+            f"copy {record.get('CopyRequestSeconds', 0):6.1f}s  "
+            f"ready {record.get('TimeToReadySeconds', 0):6.1f}s  {'✅' if record['Success'] else '❌'}")
+    logger.info(f"⏱️  Rollout finished in {total_seconds:.1f}s")
+
+    configuration = {k: v for k, v in vars(args).items() if k != "verbose"}
+    configuration["deployments"] = [f"{p}:{v}" for p, v in deployments]
+    benchmark_common.write_report(args.output_file, configuration, records)
+    if args.history_file:
+        with open(args.history_file, "a") as f:
+            f.write(json.dumps({
+                "Release": args.release,
+                "RecordedAt": datetime.now(timezone.utc).isoformat(),
+                "TotalSeconds": total_seconds,
+                "Parallelism": args.parallelism,
+                "Deployments": records,
+            }) + "\n")
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if all(r["Success"] for r in records) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
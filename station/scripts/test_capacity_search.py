@@ -0,0 +1,88 @@
+# test_capacity_search.py
+"""unit tests for capacity_search.py (no Station environment needed)"""
+from argparse import Namespace
+
+import pytest
+
+from capacity_search import evaluate, search
+
+
+def fake_trial(capacity, offered):
+    """a trial that passes at or below `capacity` req/s, recording every offered rate"""
+    def trial(rate):
+        offered.append(rate)
+        return {"OfferedRate": rate, "Passed": rate <= capacity}
+
+    return trial
+
+
+def test_grows_then_bisects_to_capacity():
+    offered = []
+    best, trials = search(fake_trial(300, offered), start_rate=50, max_rate=100000, growth=2,
+                          precision=0.05, max_trials=20)
+
+    assert offered[:4] == [50, 100, 200, 400]
+    assert best["OfferedRate"] <= 300
+    assert 300 - best["OfferedRate"] <= 0.05 * 300
+    assert len(trials) == len(offered)
+
+
+def test_first_trial_failing_bisects_below_start_rate():
+    offered = []
+    best, trials = search(fake_trial(10, offered), start_rate=50, max_rate=100000, growth=2,
+                          precision=0.05, max_trials=20)
+
+    assert offered[0] == 50
+    assert all(rate < 50 for rate in offered[1:])
+    assert best is not None and best["OfferedRate"] <= 10
+    # the pass/fail interval is narrowed to `precision` of the start rate
+    assert 10 - best["OfferedRate"] <= 0.05 * 50
+
+
+def test_no_passing_rate_returns_none():
+    best, trials = search(fake_trial(0, []), start_rate=50, max_rate=1000, growth=2, precision=0.05, max_trials=20)
+
+    assert best is None
+    assert not any(t["Passed"] for t in trials)
+
+
+def test_stops_at_max_rate():
+    offered = []
+    best, _ = search(fake_trial(float("inf"), offered), start_rate=50, max_rate=300, growth=2,
+                     precision=0.05, max_trials=20)
+
+    assert offered == [50, 100, 200, 300]
+    assert best["OfferedRate"] == 300
+
+
+def test_max_trials_bounds_the_search():
+    _, trials = search(fake_trial(12345, []), start_rate=1, max_rate=1e9, growth=2, precision=1e-9, max_trials=7)
+
+    assert len(trials) == 7
+
+
+@pytest.fixture
+def slo():
+    return Namespace(p95_ms=120, p99_ms=1000, max_error_rate=0.01, rate_tolerance=0.05)
+
+
+def trial_result(**overrides):
+    result = {"Success": True, "TotalEventsSent": 1000, "ErrorCount": 0, "DroppedRequests": 0,
+              "ActualThroughput": 100.0, "P95LatencyMs": 50.0, "P99LatencyMs": 200.0}
+    result.update(overrides)
+    return result
+
+
+def test_evaluate_passes_within_slo(slo):
+    assert evaluate(trial_result(), 100, slo) == []
+
+
+@pytest.mark.parametrize("overrides", [
+    {"P95LatencyMs": 150.0},
+    {"P99LatencyMs": 1500.0},
+    {"ErrorCount": 20},
+    {"ActualThroughput": 80.0},
+    {"DroppedRequests": 5},
+])
+def test_evaluate_flags_violations(slo, overrides):
+    assert evaluate(trial_result(**overrides), 100, slo)
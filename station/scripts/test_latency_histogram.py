@@ -0,0 +1,99 @@
+# test_latency_histogram.py
+"""unit tests for latency_histogram.py (no Station environment needed)"""
+import json
+
+import numpy as np
+import pytest
+
+from latency_histogram import LatencyHistogram
+
+HIGHEST = 60_000_000  # one minute in microseconds
+
+
+@pytest.fixture
+def samples():
+    """a heavy-tailed latency sample spanning the whole trackable range"""
+    rng = np.random.default_rng(42)
+    values = rng.lognormal(mean=8, sigma=2, size=20_000).astype(np.int64)
+    return np.clip(values, 0, HIGHEST)
+
+
+def test_record_value_matches_record_values(samples):
+    one_by_one = LatencyHistogram(highest_trackable=HIGHEST)
+    for value in samples:
+        one_by_one.record_value(value)
+    vectorized = LatencyHistogram(highest_trackable=HIGHEST)
+    vectorized.record_values(samples)
+
+    assert vectorized.total_count == len(samples)
+    assert np.array_equal(one_by_one.counts, vectorized.counts)
+
+
+@pytest.mark.parametrize("significant_figures", [2, 3, 4])
+def test_percentiles_within_precision(samples, significant_figures):
+    histogram = LatencyHistogram(highest_trackable=HIGHEST, significant_figures=significant_figures)
+    histogram.record_values(samples)
+    ordered = np.sort(samples)
+
+    for percentile in [1, 25, 50, 90, 95, 99, 99.9, 100]:
+        exact = ordered[max(0, int(np.ceil(percentile / 100 * len(ordered))) - 1)]
+        reported = histogram.value_at_percentile(percentile)
+        assert reported >= exact
+        assert reported - exact <= max(1, exact * 10 ** -significant_figures * 2)
+
+
+def test_encode_decode_round_trip(samples):
+    histogram = LatencyHistogram(highest_trackable=HIGHEST)
+    histogram.record_values(samples)
+
+    decoded = LatencyHistogram.decode(histogram.encode())
+
+    assert decoded.layout() == histogram.layout()
+    assert np.array_equal(decoded.counts, histogram.counts)
+
+
+def test_json_round_trip(samples):
+    histogram = LatencyHistogram(highest_trackable=HIGHEST, significant_figures=2)
+    histogram.record_values(samples)
+
+    restored = LatencyHistogram.from_json(json.loads(json.dumps(histogram.to_json())))
+
+    assert restored.layout() == histogram.layout()
+    assert restored.total_count == histogram.total_count == len(samples)
+    assert restored.summary() == histogram.summary()
+
+
+def test_empty_histogram_round_trips():
+    histogram = LatencyHistogram()
+
+    assert LatencyHistogram.decode(histogram.encode()).total_count == 0
+    assert histogram.summary()["P99LatencyMs"] == 0
+
+
+def test_values_above_highest_trackable_are_clamped():
+    histogram = LatencyHistogram(highest_trackable=HIGHEST)
+    histogram.record_value(HIGHEST * 10)
+    histogram.record_values(np.array([HIGHEST + 1, -5]))
+
+    assert histogram.total_count == 3
+    assert histogram.counts[histogram.counts_index(HIGHEST)] == 2
+    assert histogram.counts[histogram.counts_index(0)] == 1
+    assert histogram.value_at_percentile(100) >= HIGHEST
+
+
+def test_corrected_value_backfills_queued_requests():
+    histogram = LatencyHistogram()
+    histogram.record_corrected_value(10_000, expected_interval=1_000)
+
+    # 10ms with a 1ms interval: the stalled request plus the 9 queued behind it
+    assert histogram.total_count == 10
+    assert histogram.min() == 1_000
+
+    uncorrected = LatencyHistogram()
+    uncorrected.record_corrected_value(500, expected_interval=1_000)
+    assert uncorrected.total_count == 1
+
+
+def test_add_rejects_different_layouts():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_figures=2).add(LatencyHistogram(significant_figures=3))
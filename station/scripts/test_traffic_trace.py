@@ -0,0 +1,89 @@
+# test_traffic_trace.py
+"""unit tests for the id remapping and dependency tracking in traffic_trace.py (no Station environment needed)"""
+import uuid
+
+import pytest
+
+from traffic_trace import ReplayCopy, ReplayStats, TraceRecorder
+
+GRAIN = uuid.UUID("0f8fad5b-d9cb-469f-a165-70867728950e")
+OTHER = uuid.UUID("7c9e6679-7425-40de-944b-e07fc1f90ae7")
+
+
+def append(recorder, value, response=None):
+    """record one entry carrying `value`; returns (index, placeholderized value, entry)"""
+    used = set()
+    data = recorder._placeholderize(value, used)
+    index = recorder._append({"kind": "http"}, used)
+    if response is not None:
+        recorder._learn_ids(index, response)
+    return index, data, recorder.entries[index]
+
+
+@pytest.fixture
+def copy():
+    """a replay copy whose dependencies are already satisfied"""
+    return ReplayCopy([{"i": i} for i in range(10)], {}, ReplayStats(), dependency_timeout=1)
+
+
+def test_both_guid_spellings_share_one_placeholder():
+    recorder = TraceRecorder()
+    _, data, _ = append(recorder, {"path": f"/api/agent/{GRAIN}", "grainKey": GRAIN.hex, "other": str(OTHER)})
+
+    assert data == {"path": "/api/agent/${n0}", "grainKey": "${n0|hex}", "other": "${n1}"}
+
+
+def test_uppercase_and_longer_hex_strings():
+    recorder = TraceRecorder()
+    digest = "ab" * 32  # a 64 hex digit hash is not an id
+    _, data, _ = append(recorder, [str(GRAIN).upper(), digest])
+
+    assert data == ["${n0}", digest]
+
+
+def test_response_ids_become_producer_placeholders():
+    recorder = TraceRecorder()
+    create, _, _ = append(recorder, {"agentType": "agenttest"}, response={"data": {"id": str(OTHER)}})
+    _, data, _ = append(recorder, f"/api/agent/{OTHER.hex}")
+
+    assert data == f"/api/agent/${{r{create}:data.id|hex}}"
+
+
+def test_deps_on_producer_and_last_user():
+    recorder = TraceRecorder()
+    create, _, _ = append(recorder, {}, response={"data": {"id": str(OTHER)}})
+    unrelated, _, unrelated_entry = append(recorder, {"grainKey": GRAIN.hex})
+    read, _, read_entry = append(recorder, f"/api/agent/{OTHER}")
+    delete, _, delete_entry = append(recorder, f"/api/agent/{OTHER}")
+    _, _, reuse_entry = append(recorder, {"grainKey": str(GRAIN)})
+
+    assert "deps" not in unrelated_entry
+    assert read_entry["deps"] == [create]
+    # the producer plus the previous entry that used the same id
+    assert delete_entry["deps"] == [create, read]
+    # a client-generated id orders its users regardless of spelling
+    assert reuse_entry["deps"] == [unrelated]
+
+
+def test_lookup_keeps_the_recorded_spelling(copy):
+    dashed = copy.resolve("${n0}")
+    undashed = copy.resolve("${n0|hex}")
+
+    assert dashed != str(GRAIN)
+    assert uuid.UUID(dashed).hex == undashed
+    assert copy.resolve("${n1}") != dashed
+
+
+def test_lookup_respells_response_values(copy):
+    copy.responses[3] = {"data": {"id": str(OTHER).upper()}}
+
+    assert copy.resolve("${r3:data.id}") == str(OTHER).upper()
+    assert copy.resolve("${r3:data.id|hex}") == OTHER.hex
+    assert copy.stats.unresolved_ids == 0
+
+
+def test_unresolved_response_ids_get_fresh_guids(copy):
+    resolved = copy.resolve({"id": "${r4:data.id|hex}"})
+
+    assert len(resolved["id"]) == 32
+    assert copy.stats.unresolved_ids == 1
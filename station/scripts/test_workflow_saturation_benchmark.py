@@ -0,0 +1,52 @@
+# test_workflow_saturation_benchmark.py
+"""unit tests for knee detection in workflow_saturation_benchmark.py (no Station environment needed)"""
+import pytest
+
+from workflow_saturation_benchmark import find_knee, mark_knee
+
+
+def curve(points):
+    """results for (concurrency, throughput, median latency ms) points"""
+    return [{"ConcurrencyLevel": c, "ActualThroughput": t, "MedianLatencyMs": l, "P95LatencyMs": l * 2}
+            for c, t, l in points]
+
+
+# throughput scales until the provider's 8 slots are busy, then only queueing grows
+SATURATING = curve([(1, 1.0, 1000), (2, 2.0, 1000), (4, 3.9, 1020), (8, 7.5, 1060), (16, 7.8, 2050),
+                    (32, 7.9, 4050)])
+
+
+def test_knee_is_first_level_where_latency_outgrows_throughput():
+    assert find_knee(SATURATING) == 4
+
+
+def test_knee_uses_the_chosen_latency_percentile():
+    assert find_knee(SATURATING, latency_key="P95LatencyMs") == 4
+
+
+def test_no_knee_on_linear_scaling():
+    assert find_knee(curve([(1, 1.0, 1000), (2, 2.0, 1010), (4, 4.0, 1030)])) is None
+
+
+def test_tolerance_absorbs_small_latency_growth():
+    points = curve([(1, 10.0, 100), (2, 10.0, 115)])
+
+    assert find_knee(points, tolerance=0.1) == 1
+    assert find_knee(points, tolerance=0.2) is None
+
+
+def test_levels_without_throughput_are_skipped():
+    points = curve([(1, 0.0, 0), (2, 2.0, 1000), (4, 2.1, 2000)])
+
+    assert find_knee(points) == 2
+
+
+@pytest.mark.parametrize("knee, expected", [(4, (4, 3)), (None, (None, None))])
+def test_mark_knee_flags_knee_and_operating_point(knee, expected):
+    results = curve([(c, 1.0, 1.0) for c in (1, 2, 4, 8, 16, 32)])
+    mark_knee(results, knee)
+
+    flagged = [next((i for i, r in enumerate(results) if r[key]), None) for key in ("IsKnee", "IsOperatingPoint")]
+    assert tuple(flagged) == expected
+    assert sum(r["IsKnee"] for r in results) == (knee is not None)
+    assert sum(r["IsOperatingPoint"] for r in results) == (knee is not None)
@@ -0,0 +1,353 @@
+# timing_profiler.py
+"""
+pytest plugin that breaks down where the station/scripts suites spend their time.
+
+While a test runs, every `requests` call, `time.sleep`, SignalR start/send/stop
+and fixture setup/teardown made on the main thread is timed as a span nested
+under the test and its setup/call/teardown phase. Each span's exclusive time
+is attributed to one category:
+
+    http             requests to the Station API, grouped by route
+    token            requests to /connect/token
+    sleep            time.sleep waits and polling loops
+    signalr          SignalR hub calls, and waits in modules that use signalrcore
+    fixture-setup    fixture code itself, outside any of the above
+    fixture-teardown
+    test             the test body itself
+
+The run writes timing-profile.json (per-test breakdown by category, route,
+wait site and fixture) and timing-profile.collapsed (collapsed stacks in
+microseconds, for flamegraph.pl / speedscope / inferno) into the given
+directory, and prints the slowest tests at the end of the session.
+
+station/scripts/conftest.py loads the plugin; it stays inactive unless
+--timing-profile is given.
+
+Example:
+    pytest -s -v station/scripts/regression_test.py --timing-profile timing-profile
+    flamegraph.pl timing-profile/timing-profile.collapsed > timing-profile.svg
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from routes import route_of
+
+try:
+    from signalrcore.hub.base_hub_connection import BaseHubConnection
+except ImportError:  # SignalR spans are only recorded when signalrcore is installed
+    BaseHubConnection = None
+
+CATEGORIES = ["http", "token", "sleep", "signalr", "fixture-setup", "fixture-teardown", "test"]
+
+
+class SpanNode:
+    """One node of the span tree; `total` is inclusive wall time in seconds."""
+
+    __slots__ = ("name", "total", "count", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.total = 0.0
+        self.count = 0
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = SpanNode(name)
+        return node
+
+    @property
+    def exclusive(self):
+        return max(0.0, self.total - sum(child.total for child in self.children.values()))
+
+    def walk(self, path=()):
+        """yield (path, node) for this node and all its descendants"""
+        path = path + (self.name,)
+        yield path, self
+        for child in self.children.values():
+            yield from child.walk(path)
+
+
+def category_of(path):
+    """category an exclusive span time is attributed to, from its path in the tree"""
+    kind = path[-1].split(":", 1)[0]
+    if kind in ("http", "token", "sleep", "signalr"):
+        return kind
+    if kind == "fixture":
+        return "fixture-teardown" if "phase:teardown" in path else "fixture-setup"
+    return {"phase:call": "test", "phase:teardown": "fixture-teardown"}.get(path[-1], "fixture-setup")
+
+
+class TimingProfiler:
+    """Records span trees per test by patching requests, time.sleep and signalrcore."""
+
+    def __init__(self, output_dir, top):
+        self.output_dir = output_dir
+        self.top = top
+        self.tests = []
+        self.collapsed = []
+        self._root = None
+        self._stack = []
+        self._outcomes = {}
+        self._patches = []
+        self._signalr_modules = {}
+
+    # -- spans --------------------------------------------------------------
+
+    def _recording(self):
+        return self._root is not None and threading.current_thread() is threading.main_thread()
+
+    def enter(self, name):
+        """open a span under the innermost open span; returns a token for exit(), or None when not recording"""
+        if not self._recording():
+            return None
+        parent = self._stack[-1][0] if self._stack else self._root
+        node = parent.child(name)
+        self._stack.append((node, time.perf_counter()))
+        return node
+
+    def exit(self, token):
+        if token is None:
+            return
+        # Unwind spans left open by exceptions inside nested spans
+        while self._stack:
+            node, started = self._stack.pop()
+            node.total += time.perf_counter() - started
+            node.count += 1
+            if node is token:
+                break
+
+    def span(self, name, func, *args, **kwargs):
+        token = self.enter(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.exit(token)
+
+    # -- patching -----------------------------------------------------------
+
+    def _patch(self, owner, attribute, wrapper_factory):
+        original = getattr(owner, attribute)
+        setattr(owner, attribute, wrapper_factory(original))
+        self._patches.append((owner, attribute, original))
+
+    def install(self):
+        profiler = self
+
+        def wrap_request(original):
+            def request(session, method, url, *args, **kwargs):
+                route = route_of(method, url)
+                kind = "token" if route.endswith("/connect/token") else "http"
+                return profiler.span(f"{kind}:{route}", original, session, method, url, *args, **kwargs)
+            return request
+
+        def wrap_sleep(original):
+            def sleep(seconds):
+                if not profiler._recording():
+                    return original(seconds)
+                return profiler.span(profiler._wait_name(), original, seconds)
+            return sleep
+
+        def wrap_hub(name):
+            def factory(original):
+                def call(connection, *args, **kwargs):
+                    return profiler.span(f"signalr:{name}", original, connection, *args, **kwargs)
+                return call
+            return factory
+
+        self._patch(requests.Session, "request", wrap_request)
+        self._patch(time, "sleep", wrap_sleep)
+        if BaseHubConnection is not None:
+            for name in ("start", "send", "stop"):
+                self._patch(BaseHubConnection, name, wrap_hub(name))
+
+    def uninstall(self):
+        while self._patches:
+            owner, attribute, original = self._patches.pop()
+            setattr(owner, attribute, original)
+
+    def _wait_name(self):
+        """span name for a sleep, labelled with its call site"""
+        frame = _caller_frame()
+        module = frame.f_globals.get("__name__", "?")
+        site = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+        return f"{'signalr' if self._uses_signalr(module, frame.f_globals) else 'sleep'}:wait {site}"
+
+    def _uses_signalr(self, module, module_globals):
+        """whether a module is signalrcore itself or imports from it (its sleeps are SignalR waits)"""
+        if module not in self._signalr_modules:
+            self._signalr_modules[module] = module.startswith("signalrcore") or any(
+                isinstance(getattr(value, "__module__", None), str) and value.__module__.startswith("signalrcore")
+                for value in list(module_globals.values()))
+        return self._signalr_modules[module]
+
+    # -- pytest hooks -------------------------------------------------------
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self._root, self._stack = SpanNode(item.nodeid), []
+        yield
+        root, self._root = self._root, None
+        root.total = sum(child.total for child in root.children.values())
+        self.tests.append(self._test_record(root, self._outcomes.pop(item.nodeid, "passed")))
+        self.collapsed.extend(_collapsed_stacks(root))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item):
+        token = self.enter("phase:setup")
+        yield
+        self.exit(token)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        token = self.enter("phase:call")
+        yield
+        self.exit(token)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item, nextitem):
+        token = self.enter("phase:teardown")
+        yield
+        self.exit(token)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        token = self.enter(f"fixture:{fixturedef.argname}")
+        yield
+        self.exit(token)
+        # Finalizers run last-in first-out, so this one runs right before the
+        # fixture's own teardown; pytest_fixture_post_finalizer closes the span.
+        fixturedef.addfinalizer(lambda: self._open_teardown(fixturedef))
+
+    def _open_teardown(self, fixturedef):
+        fixturedef._timing_profile_span = self.enter(f"fixture:{fixturedef.argname}")
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        self.exit(getattr(fixturedef, "_timing_profile_span", None))
+        fixturedef._timing_profile_span = None
+
+    def pytest_runtest_logreport(self, report):
+        if report.outcome != "passed" and self._outcomes.get(report.nodeid) != "failed":
+            self._outcomes[report.nodeid] = report.outcome
+
+    def pytest_sessionfinish(self, session):
+        self.uninstall()
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, "timing-profile.json"), "w") as f:
+            json.dump({
+                "Tests": self.tests,
+                "Summary": self._summary(),
+                "GeneratedAt": datetime.now(timezone.utc).isoformat(),
+            }, f, indent=2)
+        with open(os.path.join(self.output_dir, "timing-profile.collapsed"), "w") as f:
+            f.writelines(f"{stack} {microseconds}\n" for stack, microseconds in self.collapsed)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.tests:
+            return
+        slowest = sorted(self.tests, key=lambda t: t["WallSeconds"], reverse=True)[:self.top]
+        terminalreporter.write_sep("=", f"timing profile: {len(slowest)} slowest tests")
+        for test in slowest:
+            categories = " | ".join(f"{name} {seconds:.1f}s" for name, seconds in
+                                    sorted(test["Categories"].items(), key=lambda c: c[1], reverse=True)
+                                    if seconds >= 0.05)
+            terminalreporter.write_line(f"{test['WallSeconds']:7.1f}s {test['NodeId']}  [{test['Outcome']}]")
+            terminalreporter.write_line(f"           {categories}")
+
+        summary = self._summary()
+        terminalreporter.write_sep("-", "time by category")
+        for name, seconds in summary["Categories"].items():
+            terminalreporter.write_line(f"{seconds:9.1f}s {name}")
+        terminalreporter.write_sep("-", "slowest routes and waits")
+        for label, stats in list(summary["Spans"].items())[:self.top]:
+            terminalreporter.write_line(f"{stats['Seconds']:9.1f}s {stats['Count']:5d}x {label}")
+        terminalreporter.write_line(f"📁 Timing profile written to {self.output_dir}")
+
+    # -- reporting ----------------------------------------------------------
+
+    def _test_record(self, root, outcome):
+        categories = dict.fromkeys(CATEGORIES, 0.0)
+        phases, spans, fixtures = {}, defaultdict(lambda: {"Count": 0, "Seconds": 0.0}), {}
+        for path, node in root.walk():
+            if len(path) == 1:
+                continue
+            categories[category_of(path)] += node.exclusive
+
+            kind, _, label = node.name.partition(":")
+            if kind == "phase":
+                phases[label] = node.total
+            elif kind == "fixture":
+                stage = "Teardown" if "phase:teardown" in path else "Setup"
+                fixtures.setdefault(label, {"Setup": 0.0, "Teardown": 0.0})[stage] += node.total
+            else:
+                stats = spans[node.name]
+                stats["Count"] += node.count
+                stats["Seconds"] += node.total
+
+        return {
+            "NodeId": root.name,
+            "Outcome": outcome,
+            "WallSeconds": root.total,
+            "Phases": phases,
+            "Categories": categories,
+            "Fixtures": fixtures,
+            "Spans": dict(sorted(spans.items(), key=lambda s: s[1]["Seconds"], reverse=True)),
+        }
+
+    def _summary(self):
+        categories = dict.fromkeys(CATEGORIES, 0.0)
+        spans = defaultdict(lambda: {"Count": 0, "Seconds": 0.0})
+        for test in self.tests:
+            for name, seconds in test["Categories"].items():
+                categories[name] += seconds
+            for name, stats in test["Spans"].items():
+                spans[name]["Count"] += stats["Count"]
+                spans[name]["Seconds"] += stats["Seconds"]
+        return {
+            "TotalTests": len(self.tests),
+            "WallSeconds": sum(t["WallSeconds"] for t in self.tests),
+            "Categories": categories,
+            "Spans": dict(sorted(spans.items(), key=lambda s: s[1]["Seconds"], reverse=True)),
+            "SlowestTests": [t["NodeId"] for t in sorted(self.tests, key=lambda t: t["WallSeconds"],
+                                                         reverse=True)[:self.top]],
+        }
+
+
+def _collapsed_stacks(root):
+    """(stack, exclusive microseconds) lines in the collapsed format read by flamegraph tools"""
+    for path, node in root.walk():
+        microseconds = int(node.exclusive * 1_000_000)
+        if microseconds > 0:
+            yield ";".join(frame.replace(";", ",") for frame in path), microseconds
+
+
+def _caller_frame():
+    """first frame outside this module (the code that called time.sleep)"""
+    frame = sys._getframe(1)
+    while frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    return frame
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("timing-profile", "wall time breakdown for station/scripts")
+    group.addoption("--timing-profile", metavar="DIR",
+                    help="profile where each test's wall time goes and write the breakdown into DIR")
+    group.addoption("--timing-profile-top", type=int, default=10, help="number of slowest tests to print")
+
+
+def pytest_configure(config):
+    output_dir = config.getoption("--timing-profile")
+    if output_dir:
+        profiler = TimingProfiler(output_dir, config.getoption("--timing-profile-top"))
+        profiler.install()
+        config.pluginmanager.register(profiler, "timing-profiler")
@@ -0,0 +1,567 @@
+# traffic_trace.py
+"""
+Record-and-replay traffic traces for time-scaled load replays.
+
+`record` runs pytest (e.g. regression_test.py, or any subset of its
+scenarios) with `requests` and signalrcore instrumented, and writes every HTTP
+request and SignalR start/send/stop as one trace entry: relative timestamp,
+method, route, payload, recorded status and latency. GUIDs, dashed or as 32
+hex digits (the grain keys built with str(uuid4()).replace("-", "")), are
+replaced by placeholders so a replay can remap them:
+
+    ${r12:data.id}   the value found at data.id in the response to entry 12;
+                     the entry depends on entry 12 and is only sent after it
+    ${n3}            an id the client generated itself (grain keys, node ids);
+                     every replay copy draws a fresh uuid4 for it
+    ${n3|hex}        the same id written as 32 hex digits without dashes
+
+Both spellings of one GUID map to the same id, and a replay writes each value
+back in the spelling of the placeholder.
+
+An entry also depends on the previous entry that used any of the same ids, so
+operations on one resource keep their recorded order (create, read, delete)
+while unrelated resources are replayed concurrently.
+
+Calls to /connect/token are not stored (they carry credentials); entries only
+keep the grant their bearer token came from, and `replay` fetches fresh tokens
+for those grants up front.
+
+`replay` schedules the entries at their recorded offsets divided by --speed
+(1x, 10x, 100x, ...), runs --copies independent copies of the trace at once,
+each with its own id mapping, and reports latency by route, schedule lag,
+status mismatches against the recording and unresolved ids.
+
+Traces are JSON lines, gzip-compressed when the file name ends in .gz.
+
+Example:
+    python station/scripts/traffic_trace.py record --output regression.trace.jsonl.gz \
+        -- station/scripts/regression_test.py -k "agent_operations or event_operations"
+    python station/scripts/traffic_trace.py replay regression.trace.jsonl.gz --speed 1,10,100 --copies 8
+"""
+import argparse
+import gzip
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import requests
+from signalrcore.hub.base_hub_connection import BaseHubConnection
+
+import benchmark_common
+import signalr_benchmark
+from benchmark_common import ADMIN_PASSWORD, ADMIN_USERNAME
+from latency_histogram import LatencyHistogram
+from routes import route_of
+
+logger = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+HOSTS = ["API_HOST", "API_SERVER_HOST", "AUTH_HOST"]
+
+_GUID = re.compile(
+    r"(?<![0-9a-fA-F])(?:[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|[0-9a-fA-F]{32})(?![0-9a-fA-F])")
+_PLACEHOLDER = re.compile(r"\$\{(r\d+:[^}|]*|n\d+)(\|hex)?\}")
+
+
+def open_trace(path, mode):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def write_trace(path, header, entries):
+    with open_trace(path, "w") as f:
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for entry in entries:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def read_trace(path):
+    """(header, entries) from a trace file"""
+    with open_trace(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("Trace") != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} traffic trace")
+    return lines[0], lines[1:]
+
+
+def _split_host(url):
+    """(host variable, path) for URLs under a configured host, (None, url) otherwise"""
+    for name in HOSTS:
+        base = getattr(benchmark_common, name)
+        if base and url.startswith(base.rstrip("/")):
+            return name, url[len(base.rstrip("/")):]
+    return None, url
+
+
+def _walk_strings(value, path=""):
+    """yield (dotted path, string) for every string inside a JSON value"""
+    if isinstance(value, str):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            yield from _walk_strings(child, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from _walk_strings(child, f"{path}.{index}" if path else str(index))
+
+
+def _dig(value, path):
+    for key in path.split(".") if path else []:
+        if isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        elif isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def _spell_guid(value, hex_form):
+    """`value` as a dashed GUID, or as 32 hex digits when `hex_form`; non-GUID values are returned unchanged"""
+    if ("-" in value) != hex_form:
+        return value  # already spelled that way (or not a GUID at all)
+    try:
+        guid = uuid.UUID(value)
+    except ValueError:
+        return value
+    return guid.hex if hex_form else str(guid)
+
+
+def _map_strings(value, func):
+    if isinstance(value, str):
+        return func(value)
+    if isinstance(value, dict):
+        return {key: _map_strings(child, func) for key, child in value.items()}
+    if isinstance(value, list):
+        return [_map_strings(child, func) for child in value]
+    return value
+
+
+class TraceRecorder:
+    """Context manager that records HTTP and SignalR traffic made by `requests` and signalrcore."""
+
+    def __init__(self):
+        self.entries = []
+        self.lock = threading.RLock()
+        self.started = None
+        self._ids = {}  # canonical (dashed, lowercase) GUID -> placeholder key
+        self._last_use = {}  # placeholder key -> index of the last entry using it
+        self._new_ids = 0
+        self._tokens = {}  # access token -> grant label
+        self._connections = {}  # id(connection) -> connection index
+        self._last_on_connection = {}
+        self._patches = []
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        recorder = self
+
+        def wrap(owner, name, factory):
+            original = getattr(owner, name)
+            setattr(owner, name, factory(original))
+            self._patches.append((owner, name, original))
+
+        def request_factory(original):
+            def request(session, method, url, *args, **kwargs):
+                started = time.perf_counter()
+                response = original(session, method, url, *args, **kwargs)
+                recorder._record_http(method, url, kwargs, response, started)
+                return response
+            return request
+
+        def hub_factory(op):
+            def factory(original):
+                def call(connection, *args, **kwargs):
+                    recorder._record_signalr(op, connection, args, kwargs)
+                    return original(connection, *args, **kwargs)
+                return call
+            return factory
+
+        wrap(requests.Session, "request", request_factory)
+        for op in ("start", "send", "stop"):
+            wrap(BaseHubConnection, op, hub_factory(op))
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    # -- id remapping -------------------------------------------------------
+
+    def _placeholderize(self, value, used):
+        """replace known and new GUIDs in request data with placeholders, collecting the placeholders used"""
+        def replace(match):
+            concrete = match.group(0)
+            canonical = str(uuid.UUID(concrete))
+            key = self._ids.get(canonical)
+            if key is None:
+                key = self._ids[canonical] = f"n{self._new_ids}"
+                self._new_ids += 1
+            used.add(key)
+            return f"${{{key}}}" if "-" in concrete else f"${{{key}|hex}}"
+
+        return _map_strings(value, lambda s: _GUID.sub(replace, s))
+
+    def _learn_ids(self, index, body):
+        for path, value in _walk_strings(body):
+            if _GUID.fullmatch(value) and str(uuid.UUID(value)) not in self._ids:
+                self._ids[str(uuid.UUID(value))] = f"r{index}:{path}"
+
+    def _append(self, entry, used, deps=()):
+        """append `entry`, depending on the producers and the last users of the ids in `used`"""
+        index = entry["i"] = len(self.entries)
+        deps = set(deps)
+        for key in used:
+            if key.startswith("r"):
+                deps.add(int(key[1:key.index(":")]))
+            if key in self._last_use:
+                deps.add(self._last_use[key])
+            self._last_use[key] = index
+        if deps:
+            entry["deps"] = sorted(deps)
+        self.entries.append(entry)
+        return index
+
+    # -- recording ----------------------------------------------------------
+
+    def _record_http(self, method, url, kwargs, response, started):
+        with self.lock:
+            body = _response_json(response, kwargs)
+            if urlparse(url).path.endswith("/connect/token"):
+                form = kwargs.get("data") if isinstance(kwargs.get("data"), dict) else {}
+                grant = form.get("grant_type", "client_credentials")
+                if grant == "password":
+                    grant = f"password:{form.get('username')}"
+                if isinstance(body, dict) and "access_token" in body:
+                    self._tokens[body["access_token"]] = grant
+                return
+
+            used = set()
+            base, path = _split_host(url)
+            entry = {
+                "t": round(started - self.started, 6),
+                "kind": "http",
+                "method": method.upper(),
+                "route": route_of(method, url),
+                "base": base,
+                "path": self._placeholderize(path, used),
+            }
+            if kwargs.get("params"):
+                entry["params"] = self._placeholderize(dict(kwargs["params"]), used)
+            if kwargs.get("json") is not None:
+                entry["json"] = self._placeholderize(kwargs["json"], used)
+            elif isinstance(kwargs.get("data"), dict):
+                entry["form"] = self._placeholderize(kwargs["data"], used)
+            elif kwargs.get("data") is not None:
+                data = kwargs["data"]
+                entry["data"] = self._placeholderize(data.decode() if isinstance(data, bytes) else data, used)
+
+            authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+            if authorization.startswith("Bearer "):
+                entry["auth"] = self._tokens.get(authorization[len("Bearer "):], "client_credentials")
+            entry["status"] = response.status_code
+            entry["latencyMs"] = round((time.perf_counter() - started) * 1000, 3)
+            self._learn_ids(self._append(entry, used), body)
+
+    def _record_signalr(self, op, connection, args, kwargs):
+        with self.lock:
+            key = id(connection)
+            if op == "start" and key in self._connections:
+                return  # automatic reconnects call start() again
+            index = self._connections.setdefault(key, len(self._connections))
+            used, deps = set(), set()
+            if key in self._last_on_connection:
+                deps.add(self._last_on_connection[key])
+            entry = {"t": round(time.perf_counter() - self.started, 6), "kind": "signalr", "op": op,
+                     "connection": index}
+            if op == "start":
+                entry["base"], entry["path"] = _split_host(connection.url)
+            elif op == "send":
+                method = args[0] if args else kwargs.get("method")
+                arguments = args[1] if len(args) > 1 else kwargs.get("arguments")
+                entry["method"] = method
+                entry["arguments"] = self._placeholderize(list(arguments), used)
+            self._last_on_connection[key] = self._append(entry, used, deps)
+
+    def header(self, source):
+        return {
+            "Trace": TRACE_VERSION,
+            "RecordedAt": datetime.now(timezone.utc).isoformat(),
+            "Source": source,
+            "Entries": len(self.entries),
+            "DurationSeconds": self.entries[-1]["t"] if self.entries else 0,
+        }
+
+
+def _response_json(response, kwargs):
+    if kwargs.get("stream") or "json" not in response.headers.get("Content-Type", ""):
+        return None
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+class ReplayStats:
+    """Thread-safe latency and outcome counters for one replay run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.lag = LatencyHistogram()
+        self.by_route = {}
+        self.sent = self.errors = self.status_mismatches = 0
+        self.dependency_timeouts = self.unresolved_ids = 0
+
+    def record(self, route, latency_us, lag_us, ok, status_matches):
+        with self.lock:
+            self.sent += 1
+            self.lag.record_value(max(1, lag_us))
+            if not status_matches:
+                self.status_mismatches += 1
+            if not ok:
+                self.errors += 1
+                return
+            self.latency.record_value(latency_us)
+            if route not in self.by_route:
+                self.by_route[route] = self.latency.like()
+            self.by_route[route].record_value(latency_us)
+
+    def count(self, attribute):
+        with self.lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+
+class ReplayCopy:
+    """One replay of the trace with its own id mapping, responses and SignalR connections."""
+
+    def __init__(self, entries, headers, stats, dependency_timeout):
+        self.headers = headers
+        self.stats = stats
+        self.dependency_timeout = dependency_timeout
+        self.values = {}
+        self.responses = {}
+        self.connections = {}
+        self.lock = threading.Lock()
+        self.done = {entry["i"]: threading.Event() for entry in entries}
+        self.local = threading.local()
+
+    def resolve(self, value):
+        return _map_strings(value, lambda s: _PLACEHOLDER.sub(lambda m: self._lookup(m.group(1), m.group(2)), s))
+
+    def _lookup(self, key, hex_form=None):
+        with self.lock:
+            if key not in self.values:
+                resolved = None
+                if key.startswith("r"):
+                    index, _, path = key[1:].partition(":")
+                    resolved = _dig(self.responses.get(int(index)), path)
+                if not isinstance(resolved, str):
+                    if key.startswith("r"):
+                        self.stats.count("unresolved_ids")
+                    resolved = str(uuid.uuid4())
+                self.values[key] = resolved
+            return _spell_guid(self.values[key], bool(hex_form))
+
+    def execute(self, entry, scheduled):
+        try:
+            for dep in entry.get("deps", []):
+                if not self.done[dep].wait(self.dependency_timeout):
+                    self.stats.count("dependency_timeouts")
+            lag_us = (time.perf_counter() - scheduled) * 1_000_000
+            if entry["kind"] == "http":
+                self._execute_http(entry, lag_us)
+            else:
+                self._execute_signalr(entry, lag_us)
+        except Exception as e:
+            logger.debug(f"entry {entry['i']} failed: {e}")
+            self.stats.record(entry.get("route", "signalr"), 0, 0, False, False)
+        finally:
+            self.done[entry["i"]].set()
+
+    def _execute_http(self, entry, lag_us):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        base = getattr(benchmark_common, entry["base"]) if entry["base"] else ""
+        headers = dict(self.headers.get(entry.get("auth")) or {"Content-Type": "application/json"})
+        kwargs = {"params": self.resolve(entry.get("params")), "headers": headers, "verify": False}
+        if "json" in entry:
+            kwargs["json"] = self.resolve(entry["json"])
+        elif "form" in entry:
+            kwargs["data"] = self.resolve(entry["form"])
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif "data" in entry:
+            kwargs["data"] = self.resolve(entry["data"])
+
+        started = time.perf_counter()
+        response = session.request(entry["method"], base + self.resolve(entry["path"]), **kwargs)
+        latency_us = (time.perf_counter() - started) * 1_000_000
+        self.responses[entry["i"]] = _response_json(response, {})
+        self.stats.record(entry["route"], latency_us, lag_us, response.status_code < 400,
+                          response.status_code == entry.get("status"))
+
+    def _execute_signalr(self, entry, lag_us):
+        route = f"SIGNALR {entry['op'].upper()}" + (f" {entry['method']}" if entry["op"] == "send" else "")
+        started = time.perf_counter()
+        if entry["op"] == "start":
+            base = getattr(benchmark_common, entry["base"]) if entry["base"] else ""
+            connection = signalr_benchmark.build_connection(base + entry["path"])
+            signalr_benchmark.start_connection(connection)
+            self.connections[entry["connection"]] = connection
+        elif entry["op"] == "send":
+            self.connections[entry["connection"]].send(entry["method"], self.resolve(entry["arguments"]))
+        else:
+            signalr_benchmark.stop_connection(self.connections.pop(entry["connection"]))
+        self.stats.record(route, (time.perf_counter() - started) * 1_000_000, lag_us, True, True)
+
+    def close(self):
+        for connection in self.connections.values():
+            signalr_benchmark.stop_connection(connection)
+        self.connections.clear()
+
+
+def fetch_tokens(entries, credentials):
+    """bearer headers for every grant the trace uses"""
+    headers = {}
+    for grant in sorted({entry["auth"] for entry in entries if entry.get("auth")}):
+        if grant == "client_credentials":
+            token = benchmark_common.fetch_client_token()
+        else:
+            username = grant.partition(":")[2]
+            password = credentials.get(username, ADMIN_PASSWORD if username == ADMIN_USERNAME else None)
+            if password is None:
+                raise SystemExit(f"trace uses the password grant for {username!r}; pass --credential {username}:PASSWORD")
+            token = benchmark_common.fetch_password_token(username, password)
+        headers[grant] = benchmark_common.bearer_headers(token)
+    return headers
+
+
+def replay(entries, speed, copies, workers, headers, dependency_timeout, copy_stagger=0.0):
+    """replay `copies` copies of the trace at `speed`; returns a result dict shaped like the C# BenchmarkResult"""
+    stats = ReplayStats()
+    replays = [ReplayCopy(entries, headers, stats, dependency_timeout) for _ in range(copies)]
+    start_at = time.perf_counter() + 0.5
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def schedule(copy, offset):
+            for entry in entries:
+                scheduled = start_at + offset + entry["t"] / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(copy.execute, entry, scheduled)
+
+        schedulers = [threading.Thread(target=schedule, args=(copy, n * copy_stagger), daemon=True)
+                      for n, copy in enumerate(replays)]
+        for scheduler in schedulers:
+            scheduler.start()
+        for scheduler in schedulers:
+            scheduler.join()
+    # Leaving the pool waits for every submitted entry to finish
+    actual_duration = max(1e-9, time.perf_counter() - start_at)
+    for copy in replays:
+        copy.close()
+
+    processed = stats.sent - stats.errors
+    by_route = {
+        route: {**histogram.summary(), "Count": histogram.total_count,
+                "Throughput": histogram.total_count / actual_duration}
+        for route, histogram in sorted(stats.by_route.items())
+    }
+    return {
+        "Speed": speed,
+        "ConcurrencyLevel": copies,
+        "DurationSeconds": (entries[-1]["t"] if entries else 0) / speed,
+        "ActualDurationSeconds": actual_duration,
+        "Success": processed > 0,
+        "TotalEventsSent": stats.sent,
+        "TotalEventsProcessed": processed,
+        "ErrorCount": stats.errors,
+        "StatusMismatches": stats.status_mismatches,
+        "DependencyTimeouts": stats.dependency_timeouts,
+        "UnresolvedIds": stats.unresolved_ids,
+        "ActualThroughput": processed / actual_duration,
+        **stats.latency.summary(),
+        "ScheduleLagP50Ms": stats.lag.value_at_percentile(50) / 1000.0,
+        "ScheduleLagP99Ms": stats.lag.value_at_percentile(99) / 1000.0,
+        "ByKey": by_route,
+    }
+
+
+def record_command(args):
+    import pytest
+
+    with TraceRecorder() as recorder:
+        exit_code = pytest.main(args.pytest_args)
+    write_trace(args.output, recorder.header(" ".join(args.pytest_args)), recorder.entries)
+    dependent = sum(1 for entry in recorder.entries if entry.get("deps"))
+    logger.info(f"🎬 Recorded {len(recorder.entries)} entries ({dependent} with id dependencies) "
+                f"over {recorder.header('')['DurationSeconds']:.1f}s into {args.output} (pytest exit code {exit_code})")
+    return 0 if recorder.entries else 1
+
+
+def replay_command(args):
+    header, entries = read_trace(args.trace)
+    logger.info(f"📼 Loaded {len(entries)} entries ({header['DurationSeconds']:.1f}s) recorded from {header['Source']}")
+    credentials = dict(c.split(":", 1) for c in args.credential)
+    headers = fetch_tokens(entries, credentials)
+
+    results = []
+    for speed in args.speed:
+        logger.info(f"▶️  Replaying {args.copies} copies at {speed:g}x")
+        result = replay(entries, speed, args.copies, args.workers, headers, args.dependency_timeout,
+                        args.copy_stagger)
+        results.append(result)
+        logger.info(
+            f"{speed:6g}x | {result['ActualThroughput']:8.1f} req/s | p50 {result['MedianLatencyMs']:.1f}ms "
+            f"p95 {result['P95LatencyMs']:.1f}ms p99 {result['P99LatencyMs']:.1f}ms | "
+            f"lag p99 {result['ScheduleLagP99Ms']:.0f}ms | errors {result['ErrorCount']} "
+            f"status mismatches {result['StatusMismatches']} unresolved ids {result['UnresolvedIds']}")
+
+    configuration = {k: v for k, v in vars(args).items() if k not in ("verbose", "credential", "func")}
+    configuration["traceSource"] = header["Source"]
+    benchmark_common.write_report(args.output_file, configuration, results)
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if all(r["Success"] for r in results) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay Station HTTP/SignalR traffic traces")
+    parser.add_argument("--verbose", action="store_true")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="run pytest and record its traffic")
+    record.add_argument("--output", default="traffic.trace.jsonl.gz")
+    record.add_argument("pytest_args", nargs=argparse.REMAINDER,
+                        help="arguments passed to pytest (prefix with --)")
+    record.set_defaults(func=record_command)
+
+    play = subparsers.add_parser("replay", help="replay a recorded trace")
+    play.add_argument("trace")
+    play.add_argument("--speed", type=lambda v: [float(x) for x in v.split(",")], default=[1.0],
+                      help="comma separated time-scale factors, e.g. 1,10,100")
+    play.add_argument("--copies", type=int, default=1, help="independent copies of the trace replayed at once")
+    play.add_argument("--copy-stagger", type=float, default=0.0, help="seconds between the starts of the copies")
+    play.add_argument("--workers", type=int, default=64, help="request threads shared by all copies")
+    play.add_argument("--dependency-timeout", type=float, default=60)
+    play.add_argument("--credential", action="append", default=[], metavar="USER:PASSWORD",
+                      help="password for a password-grant user in the trace (admin defaults to ADMIN_PASSWORD)")
+    play.add_argument("--output-file", default="replay-results.json")
+    play.set_defaults(func=replay_command)
+
+    args = parser.parse_args(argv)
+    if args.command == "record" and args.pytest_args[:1] == ["--"]:
+        args.pytest_args = args.pytest_args[1:]
+    benchmark_common.configure_logging(args.verbose)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,237 @@
+# validation_benchmark.py
+"""
+Bulk config-validation throughput benchmark.
+
+test_agent_validation_basic posts a single `{"name": "TestAgent"}` to
+/api/agent/validation/validate-config. This benchmark generates a corpus of
+valid and invalid configJson variants across payload sizes, nesting depths and
+agent namespaces, caches it on disk so runs are reproducible, and drives the
+endpoint concurrently, reporting latency by payload size, overall throughput
+and the IsValid verdicts returned for each variant kind (warmup excluded).
+
+Valid variants are FrontInitConfig, the config type the validator resolves for
+the test agents; wrong_type variants replace its studentIds array with a
+nested object.
+
+The corpus is a JSON-lines file keyed by the generator parameters; it is only
+regenerated when missing or when --regenerate is passed.
+
+Example:
+    python station/scripts/validation_benchmark.py --sizes 128,4096,65536 --concurrency 16 --duration 60
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import benchmark_common
+from benchmark_common import API_HOST
+
+logger = logging.getLogger(__name__)
+
+# the validator matches gAgentNamespace against Type.FullName; both test agents take FrontInitConfig
+DEFAULT_NAMESPACES = [
+    "Aevatar.Application.Grains.Agents.TestAgent.AgentTest",
+    "Aevatar.Application.Grains.Agents.TestAgent.AgentPermissionTest",
+]
+VARIANT_KINDS = ["valid", "malformed_json", "wrong_type", "unknown_namespace"]
+CORPUS_VERSION = 2  # bump when the generated configs change so cached corpora are regenerated
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmark-cache")
+
+
+def _front_init_config(rng, target_size):
+    """a FrontInitConfig (name, studentIds, jobType, url, memo) padded to about `target_size` bytes"""
+    config = {
+        "name": f"Agent{rng.randint(0, 99999)}",
+        "studentIds": [rng.randint(1, 99999) for _ in range(rng.randint(1, 8))],
+        "jobType": rng.randint(0, 2),  # JobType enum: Teacher, Professor, Dean
+        "url": f"https://school{rng.randint(0, 999)}.example.com",
+        "memo": "",
+    }
+    # half of the padding goes into the studentIds array, the rest into the memo string
+    while len(json.dumps(config)) < target_size / 2:
+        config["studentIds"].append(rng.randint(1, 99999))
+    return _pad_memo(config, target_size)
+
+
+def _pad_memo(config, target_size):
+    config["memo"] = ""
+    config["memo"] = "x" * max(0, target_size - len(json.dumps(config)))
+    return config
+
+
+def _nested_object(rng, depth):
+    """a JSON object nested `depth` levels deep"""
+    root = node = {}
+    for level in range(depth):
+        child = {"level": level, "enabled": rng.random() < 0.5}
+        node[f"section{level}"] = child
+        node = child
+    return root
+
+
+def generate_variant(rng, kind, size, depth, namespaces):
+    """one corpus entry of the given `kind`; only wrong_type entries are nested (`depth` levels)"""
+    namespace = rng.choice(namespaces)
+    config = _front_init_config(rng, size)
+    if kind == "valid":
+        config_json = json.dumps(config)
+    elif kind == "malformed_json":
+        config_json = json.dumps(config)[:-max(1, size // 10)]
+    elif kind == "wrong_type":
+        config["studentIds"] = _nested_object(rng, depth)
+        config_json = json.dumps(_pad_memo(config, size))
+    elif kind == "unknown_namespace":
+        namespace = f"Aevatar.GAgents.Unknown{rng.randint(0, 9999)}GAgent"
+        config_json = json.dumps(config)
+    else:
+        raise ValueError(f"unknown variant kind {kind}")
+    return {
+        "kind": kind,
+        "sizeBucket": size,
+        "depth": depth if kind == "wrong_type" else 0,
+        "gAgentNamespace": namespace,
+        "configJson": config_json,
+    }
+
+
+def generate_corpus(count, sizes, max_depth, namespaces, kinds, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        entry = generate_variant(rng, kinds[index % len(kinds)], rng.choice(sizes),
+                                 rng.randint(0, max_depth), namespaces)
+        entry["id"] = index
+        corpus.append(entry)
+    return corpus
+
+
+def load_corpus(args):
+    """load the cached corpus for these generator parameters, generating it on first use"""
+    parameters = {
+        "version": CORPUS_VERSION,
+        "count": args.corpus_size,
+        "sizes": args.sizes,
+        "maxDepth": args.max_depth,
+        "namespaces": args.namespaces,
+        "kinds": args.kinds,
+        "seed": args.random_seed,
+    }
+    digest = hashlib.sha1(json.dumps(parameters, sort_keys=True).encode()).hexdigest()[:12]
+    path = args.corpus or os.path.join(DEFAULT_CORPUS_DIR, f"validation-corpus-{digest}.jsonl")
+
+    if os.path.exists(path) and not args.regenerate:
+        with open(path) as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+        logger.info(f"📦 Loaded {len(corpus)} cached configs from {path}")
+        return corpus, path
+
+    corpus = generate_corpus(args.corpus_size, args.sizes, args.max_depth, args.namespaces, args.kinds,
+                             args.random_seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        for entry in corpus:
+            f.write(json.dumps(entry) + "\n")
+    logger.info(f"📦 Generated {len(corpus)} configs into {path}")
+    return corpus, path
+
+
+class VerdictCounter:
+    """Counts IsValid verdicts per variant kind across request threads."""
+
+    def __init__(self):
+        self.measure_from = 0.0  # verdicts returned before this perf_counter time (warmup) are not counted
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, kind, verdict):
+        if time.perf_counter() < self.measure_from:
+            return
+        with self.lock:
+            per_kind = self.counts.setdefault(kind, {"valid": 0, "invalid": 0, "unknown": 0})
+            per_kind[verdict] += 1
+
+
+def validation_request(corpus, headers, verdicts):
+    """build a run_closed_loop request callable cycling through the corpus"""
+    bodies = [
+        (entry, json.dumps({"gAgentNamespace": entry["gAgentNamespace"], "configJson": entry["configJson"]}))
+        for entry in corpus
+    ]
+    cursor = itertools.count()
+
+    def request(session):
+        entry, body = bodies[next(cursor) % len(bodies)]
+        response = session.post(
+            f"{API_HOST}/api/agent/validation/validate-config",
+            data=body,
+            headers=headers,
+            verify=False
+        )
+        if response.status_code != 200:
+            return False, entry["sizeBucket"]
+        data = response.json().get("data") or {}
+        is_valid = data.get("isValid")
+        verdicts.add(entry["kind"], "unknown" if is_valid is None else ("valid" if is_valid else "invalid"))
+        return True, entry["sizeBucket"]
+
+    return request
+
+
+def _csv(cast):
+    return lambda value: [cast(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk config-validation throughput benchmark")
+    parser.add_argument("--corpus", help="corpus file (default: cached under station/scripts/.benchmark-cache)")
+    parser.add_argument("--regenerate", action="store_true", help="regenerate the corpus even if cached")
+    parser.add_argument("--corpus-size", type=int, default=2000)
+    parser.add_argument("--sizes", type=_csv(int), default=[128, 1024, 8192, 65536], help="payload sizes in bytes")
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--namespaces", type=_csv(str), default=DEFAULT_NAMESPACES)
+    parser.add_argument("--kinds", type=_csv(str), default=VARIANT_KINDS)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--output-file", default="validation-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    unknown = set(args.kinds) - set(VARIANT_KINDS)
+    if unknown:
+        parser.error(f"unknown variant kinds {sorted(unknown)}; choose from {VARIANT_KINDS}")
+
+    corpus, corpus_path = load_corpus(args)
+    headers = benchmark_common.bearer_headers(benchmark_common.fetch_client_token())
+    verdicts = VerdictCounter()
+
+    logger.info(f"🚀 Validating {len(corpus)} configs with {args.concurrency} threads for {args.duration}s")
+    verdicts.measure_from = time.perf_counter() + args.warmup
+    result = benchmark_common.run_closed_loop(validation_request(corpus, headers, verdicts),
+                                              args.concurrency, args.duration, args.warmup)
+    result["Verdicts"] = verdicts.counts
+
+    logger.info(f"⚡ Throughput: {result['ActualThroughput']:.1f} validations/sec, errors {result['ErrorCount']}")
+    for size, stats in result.get("ByKey", {}).items():
+        logger.info(f"   {int(size):>8d} B | {stats['Throughput']:8.1f}/s | p50 {stats['MedianLatencyMs']:.1f}ms "
+                    f"p95 {stats['P95LatencyMs']:.1f}ms p99 {stats['P99LatencyMs']:.1f}ms")
+    for kind, counts in verdicts.counts.items():
+        logger.info(f"   {kind:18s} verdicts {counts}")
+
+    configuration = {k: v for k, v in vars(args).items() if k != "verbose"}
+    configuration["corpus"] = corpus_path
+    benchmark_common.write_report(args.output_file, configuration, [result])
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if result["Success"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+# workflow_saturation_benchmark.py
+"""
+Saturation-curve benchmark for the LLM-backed workflow endpoints.
+
+/api/workflow/generate and /api/workflow/text-completion/generate are the
+slowest Station endpoints. This benchmark ramps concurrency against each of
+them, records throughput and latency percentiles per level, and detects the
+knee: the first level where latency grows faster than throughput, i.e. where
+adding clients mostly adds queueing. The level before it is the useful
+operating point.
+
+With --offline the endpoints are served by the local stub in llm_stub.py
+(no Station, no auth), which is handy for validating the harness itself.
+
+Example:
+    python station/scripts/workflow_saturation_benchmark.py --levels 1,2,4,8,16,32 --duration 60
+    python station/scripts/workflow_saturation_benchmark.py --offline --max-concurrency 8 --duration 10
+"""
+import argparse
+import logging
+
+import benchmark_common
+import llm_stub
+from benchmark_common import API_HOST
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    "workflow-generate": (
+        "/api/workflow/generate",
+        {"userGoal": "Create a social media marketing campaign workflow that includes content creation, "
+                     "review, and publishing"},
+    ),
+    "text-completion": (
+        "/api/workflow/text-completion/generate",
+        {"userGoal": "I want to write a blog post about artificial intelligence and its impact on modern"},
+    ),
+}
+
+
+def endpoint_request(host, path, payload, headers):
+    """build a run_closed_loop request callable posting `payload` to `path`"""
+    def request(session):
+        response = session.post(f"{host}{path}", json=payload, headers=headers, verify=False)
+        return response.status_code == 200
+
+    return request
+
+
+def find_knee(results, latency_key="MedianLatencyMs", tolerance=0.1):
+    """
+    index of the first level whose latency grew faster than its throughput
+    (by more than `tolerance`) relative to the previous level, or None.
+    Results must be ordered by increasing concurrency.
+    """
+    for index in range(1, len(results)):
+        previous, current = results[index - 1], results[index]
+        if previous["ActualThroughput"] <= 0 or previous[latency_key] <= 0:
+            continue
+        throughput_growth = current["ActualThroughput"] / previous["ActualThroughput"]
+        latency_growth = current[latency_key] / previous[latency_key]
+        if latency_growth > throughput_growth * (1 + tolerance):
+            return index
+    return None
+
+
+def mark_knee(results, knee):
+    """flag the knee level (IsKnee) and the level before it (IsOperatingPoint) on every result"""
+    for index, result in enumerate(results):
+        result["IsKnee"] = knee is not None and index == knee
+        result["IsOperatingPoint"] = knee is not None and index == knee - 1
+
+
+def ramp(name, request, levels, duration, warmup):
+    """run `request` at every concurrency level; returns the per-level results"""
+    results = []
+    for level in levels:
+        result = benchmark_common.run_closed_loop(request, level, duration, warmup)
+        result["Endpoint"] = name
+        results.append(result)
+        logger.info(
+            f"{name:18s} | concurrency {level:4d} | {result['ActualThroughput']:7.2f} req/s | "
+            f"p50 {result['MedianLatencyMs']:.0f}ms p95 {result['P95LatencyMs']:.0f}ms "
+            f"p99 {result['P99LatencyMs']:.0f}ms | errors {result['ErrorCount']}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Saturation curves for the LLM-backed workflow endpoints")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"comma separated subset of {list(ENDPOINTS)}")
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=60, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--knee-latency", default="MedianLatencyMs",
+                        choices=["AverageLatencyMs", "MedianLatencyMs", "P95LatencyMs", "P99LatencyMs"])
+    parser.add_argument("--knee-tolerance", type=float, default=0.1)
+    parser.add_argument("--offline", action="store_true", help="benchmark the local stub instead of API_HOST")
+    llm_stub.add_stub_arguments(parser)
+    parser.add_argument("--output-file", default="workflow-saturation-results.json")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    benchmark_common.configure_logging(args.verbose)
+    names = [name for name in args.endpoints.split(",") if name]
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints {sorted(unknown)}; choose from {list(ENDPOINTS)}")
+
+    if args.offline:
+        stub = llm_stub.start_stub(0, args.max_concurrency, args.base_latency_ms, args.jitter_ms,
+                                   args.tokens_per_second, args.completion_tokens)
+        host, headers = llm_stub.stub_url(stub), {"Content-Type": "application/json"}
+        logger.info(f"🤖 Offline run against stub at {host}")
+    else:
+        host = API_HOST
+        headers = benchmark_common.bearer_headers(benchmark_common.fetch_client_token())
+
+    results = []
+    for name in names:
+        path, payload = ENDPOINTS[name]
+        curve = ramp(name, endpoint_request(host, path, payload, headers), args.levels, args.duration, args.warmup)
+        knee = find_knee(curve, args.knee_latency, args.knee_tolerance)
+        mark_knee(curve, knee)
+        if knee is None:
+            logger.info(f"📈 {name}: no knee up to concurrency {args.levels[-1]}")
+        else:
+            best = curve[knee - 1]
+            logger.info(
+                f"📈 {name}: knee at concurrency {curve[knee]['ConcurrencyLevel']} (latency outgrows throughput); "
+                f"operating point at concurrency {best['ConcurrencyLevel']} "
+                f"({best['ActualThroughput']:.2f} req/s, p50 {best['MedianLatencyMs']:.0f}ms)")
+        results.extend(curve)
+
+    configuration = {k: v for k, v in vars(args).items() if k != "verbose"}
+    benchmark_common.write_report(args.output_file, configuration, results)
+    logger.info(f"📁 Results written to {args.output_file}")
+    return 0 if all(r["Success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
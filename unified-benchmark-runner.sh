@@ -112,6 +112,36 @@ parse_and_check_thresholds() {
             awk -v a="$p99" -v b="$threshold_p99" 'BEGIN{ if (a+0 > b+0) exit 1 }' || fail=1
             awk -v a="$processed_ratio" -v b="$threshold_processed" 'BEGIN{ if (a+0 < b+0) exit 1 }' || fail=1
             ;;
+
+        "Capacity")
+            echo "📊 Processing capacity search results..."
+            
+            local capacity=$(jq -r '.Summary.CapacityRps // 0' "$results_file")
+            local throughput=$(jq -r '.Summary.CapacityThroughput // 0' "$results_file")
+            local p95=$(jq -r '.Summary.P95LatencyAtCapacityMs // 0' "$results_file")
+            local p99=$(jq -r '.Summary.P99LatencyAtCapacityMs // 0' "$results_file")
+            local trials=$(jq -r '.Summary.Trials // 0' "$results_file")
+            local build=$(jq -r '.Summary.Build // ""' "$results_file")
+            
+            local threshold_capacity=${CAP_MIN_RPS:-"0"}
+            
+            echo "📊 Capacity Search Results (SLO: P95 ≤${LAT_P95_MS:-120}ms, P99 ≤${LAT_P99_MS:-1000}ms):"
+            printf "   🏁 Capacity: %.1f req/s (target: ≥%s req/s)\n" $capacity $threshold_capacity
+            printf "   📈 P95 Latency at capacity: %.1fms\n" $p95
+            printf "   📊 P99 Latency at capacity: %.1fms\n" $p99
+            printf "   ⚡ Throughput at capacity: %.1f req/s\n" $throughput
+            echo "   🔁 Trials: $trials"
+            
+            # Print metrics to logs in structured format for workflow parsing
+            echo "📊 === CAPACITY_METRICS_BEGIN ==="
+            echo "{\"capacity\": $capacity, \"throughput\": $throughput, \"p95\": $p95, \"p99\": $p99, \"trials\": $trials, \"build\": \"$build\", \"testType\": \"Capacity\"}"
+            echo "📊 === CAPACITY_METRICS_END ==="
+            
+            # Check thresholds (no rate meeting the SLOs is always a failure)
+            local fail=0
+            awk -v a="$capacity" 'BEGIN{ if (a+0 <= 0) exit 1 }' || fail=1
+            awk -v a="$capacity" -v b="$threshold_capacity" 'BEGIN{ if (a+0 < b+0) exit 1 }' || fail=1
+            ;;
     esac
     
     echo "$fail" > threshold_result.txt
@@ -193,9 +223,43 @@ main() {
             parse_and_check_thresholds "Latency" "latency-results.json"
             ;;
             
+        "capacity")
+            echo "🔎 Running Capacity Search..."
+            
+            # Capacity search parameters with defaults; SLOs come from LAT_P95_MS / LAT_P99_MS
+            CAP_PATH=${CAP_PATH:-"/api/agent/agent-type-info-list"}
+            CAP_METHOD=${CAP_METHOD:-"GET"}
+            CAP_START_RATE=${CAP_START_RATE:-"50"}
+            CAP_MAX_RATE=${CAP_MAX_RATE:-"20000"}
+            CAP_TRIAL_DURATION=${CAP_TRIAL_DURATION:-"30"}
+            CAP_TRIAL_WARMUP=${CAP_TRIAL_WARMUP:-$COMMON_WARMUP}
+            CAP_PROCESSES=${CAP_PROCESSES:-"4"}
+            CAP_THREADS=${CAP_THREADS:-"32"}
+            CAP_BUILD=${CAP_BUILD:-${GITHUB_SHA:-""}}
+            
+            echo "  Parameters: ${CAP_METHOD} ${CAP_PATH}, ${CAP_START_RATE}-${CAP_MAX_RATE} req/s, ${CAP_TRIAL_DURATION}s trials, SLO P95 ≤${LAT_P95_MS:-120}ms P99 ≤${LAT_P99_MS:-1000}ms"
+            
+            # A search that finds no passing rate exits non-zero; the threshold check reports it
+            python3 /app/scripts/capacity_search.py \
+                --method ${CAP_METHOD} \
+                --path ${CAP_PATH} \
+                --p95-ms ${LAT_P95_MS:-120} \
+                --p99-ms ${LAT_P99_MS:-1000} \
+                --start-rate ${CAP_START_RATE} \
+                --max-rate ${CAP_MAX_RATE} \
+                --trial-duration ${CAP_TRIAL_DURATION} \
+                --trial-warmup ${CAP_TRIAL_WARMUP} \
+                --processes ${CAP_PROCESSES} \
+                --threads ${CAP_THREADS} \
+                --build "${CAP_BUILD}" \
+                --output-file capacity-results.json || true
+            
+            parse_and_check_thresholds "Capacity" "capacity-results.json"
+            ;;
+            
         *)
             echo "❌ Unknown benchmark type: $BENCHMARK_TYPE"
-            echo "   Supported types: broadcast, latency"
+            echo "   Supported types: broadcast, latency, capacity"
             echo "status=ERROR" > benchmark_status.txt
             exit 1
             ;;
@@ -205,7 +269,7 @@ main() {
     local status=$(cat benchmark_status.txt | cut -d'=' -f2)
     cat > benchmark_summary.txt << EOF
 🎯 $BENCHMARK_TYPE Benchmark Summary:
-- Test Type: Orleans $(echo $BENCHMARK_TYPE | sed 's/broadcast/Broadcast Messaging/g' | sed 's/latency/Point-to-Point Messaging/g')
+- Test Type: Orleans $(echo $BENCHMARK_TYPE | sed 's/broadcast/Broadcast Messaging/g' | sed 's/latency/Point-to-Point Messaging/g' | sed 's/capacity/HTTP Capacity Search/g')
 - Status: $status
 - Results available in: /tmp/results/
 EOF